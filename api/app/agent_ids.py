@@ -5,16 +5,28 @@ Queries the Foundry project's agent listing API to discover provisioned
 agents by their known names, replacing the old agent_ids.json file
 dependency.  Results are cached with a configurable TTL.
 
+Async callers (FastAPI handlers) should use load_agent_ids_async(), which
+refreshes via the async Foundry client so a cache miss never stalls the
+event loop.  The sync load_agent_ids() remains for threaded callers.
+
 All modules that need agent IDs, names, or agent lists should import
 from here instead of independently querying Foundry.
 """
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
 import logging
 import os
+import random
 import threading
 import time
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+
+from app.paths import settings  # side-effect: loads .env before the reads below
 
 logger = logging.getLogger(__name__)
 
@@ -22,53 +34,156 @@ logger = logging.getLogger(__name__)
 # Known agent names — must match what agent_provisioner.py creates
 # ---------------------------------------------------------------------------
 
-AGENT_NAMES = {
+AGENT_NAMES = frozenset({
     "GraphExplorerAgent",
     "TelemetryAgent",
     "RunbookKBAgent",
     "HistoricalTicketAgent",
     "Orchestrator",
-}
+})
+
+# Sub-agents in the order they appear in the discovery result
+_SUB_AGENT_ORDER = (
+    "GraphExplorerAgent",
+    "TelemetryAgent",
+    "RunbookKBAgent",
+    "HistoricalTicketAgent",
+)
 
 # ---------------------------------------------------------------------------
 # TTL-based cache (thread-safe)
 # ---------------------------------------------------------------------------
 
-_cache: dict | None = None
-_cache_time: float = 0.0
+_cache: Mapping | None = None
+_cache_time: float = 0.0  # time.monotonic() of the last fill
+# Views derived from _cache once per fill, served as-is by the getters:
+# (source mapping, {id: name}, agent stubs).  Published as one tuple so a
+# reader never pairs one fill's views with another fill's mapping.
+_views: tuple[Mapping | None, Mapping[str, str], tuple[Mapping, ...]] = (
+    None, MappingProxyType({}), (),
+)
 _cache_lock = threading.Lock()
-_refresh_in_progress = False
+# Set while a refresh is in flight; cold-cache callers wait on it instead of
+# issuing their own Foundry call (single-flight).
+_refresh_event: threading.Event | None = None
+_REFRESH_WAIT_TIMEOUT = 30.0
 _CACHE_TTL = float(os.getenv("AGENT_DISCOVERY_TTL", "300"))  # 5 min default
+# Empty results (Foundry not configured, list failed, no agents yet) are
+# cached too, but only briefly so provisioning/outages recover quickly.
+_EMPTY_TTL = float(os.getenv("AGENT_DISCOVERY_EMPTY_TTL", "30"))
+# Effective TTL for the current fill — jittered ±10% so worker processes
+# started together don't all expire (and hit Foundry) in the same second.
+_cache_ttl_effective: float = _CACHE_TTL
+
+# Async credential + project client singletons.  Clients are reused across
+# refreshes so later discoveries skip TLS/connection setup.  (The sync pair
+# is memoized with functools.cache below; these need explicit teardown.)
+_async_credential = None
+_async_project_client = None
+
+
+@functools.cache
+def get_credential():
+    """Return the process-wide DefaultAzureCredential (shared with orchestrator)."""
+    from azure.identity import DefaultAzureCredential
+    return DefaultAzureCredential()
+
+
+@functools.lru_cache(maxsize=8)
+def normalized_endpoint(endpoint: str, project_name: str) -> str:
+    """Return the project-scoped form of a Foundry endpoint."""
+    endpoint = endpoint.rstrip("/")
+    # Ensure endpoint uses services.ai.azure.com and has /api/projects/ path
+    if "/api/projects/" not in endpoint:
+        endpoint = endpoint.replace("cognitiveservices.azure.com", "services.ai.azure.com")
+        endpoint = f"{endpoint}/api/projects/{project_name}"
+    return endpoint
 
-# Cached credential singleton
-_credential = None
+
+def _project_endpoint() -> str | None:
+    """Return the project-scoped Foundry endpoint, or None if not configured."""
+    endpoint = settings.project_endpoint.rstrip("/")
+    project_name = settings.ai_foundry_project_name
+    if not endpoint or not project_name:
+        return None
+    return normalized_endpoint(endpoint, project_name)
 
 
-def _get_credential():
-    global _credential
-    if _credential is None:
-        from azure.identity import DefaultAzureCredential
-        _credential = DefaultAzureCredential()
-    return _credential
+# Resolved once at import — the env doesn't change after startup
+_PROJECT_ENDPOINT = _project_endpoint()
 
 
+@functools.cache
 def _get_project_client():
-    """Create an AIProjectClient for the current project."""
+    """Return the shared AIProjectClient for the current project."""
     from azure.ai.projects import AIProjectClient
 
-    endpoint = os.environ.get("PROJECT_ENDPOINT", "").rstrip("/")
-    project_name = os.environ.get("AI_FOUNDRY_PROJECT_NAME", "")
-    if not endpoint or not project_name:
+    if _PROJECT_ENDPOINT is None:
         return None
-    # Ensure endpoint uses services.ai.azure.com and has /api/projects/ path
-    if "/api/projects/" not in endpoint:
-        endpoint = endpoint.replace("cognitiveservices.azure.com", "services.ai.azure.com")
-        endpoint = f"{endpoint}/api/projects/{project_name}"
-    return AIProjectClient(endpoint=endpoint, credential=_get_credential())
+    client = AIProjectClient(endpoint=_PROJECT_ENDPOINT, credential=get_credential())
+    atexit.register(client.close)
+    return client
+
 
+def get_async_credential():
+    """Return the process-wide async DefaultAzureCredential (shared with orchestrator).
+
+    Closed by close_clients() on app shutdown.
+    """
+    global _async_credential
+    if _async_credential is None:
+        from azure.identity.aio import DefaultAzureCredential
+        _async_credential = DefaultAzureCredential()
+    return _async_credential
 
-def _discover_agents() -> dict:
-    """Query AI Foundry and return an agent_ids-compatible dict.
+
+def _get_async_project_client():
+    """Return the shared async AIProjectClient for the current project.
+
+    Raises ImportError if the async transport (aiohttp) is unavailable.
+    Closed by close_clients() on app shutdown.
+    """
+    global _async_project_client
+    if _async_project_client is None:
+        from azure.ai.projects.aio import AIProjectClient
+
+        if _PROJECT_ENDPOINT is None:
+            return None
+        _async_project_client = AIProjectClient(
+            endpoint=_PROJECT_ENDPOINT, credential=get_async_credential(),
+        )
+    return _async_project_client
+
+
+async def close_clients() -> None:
+    """Close the shared async client and credential (FastAPI shutdown hook)."""
+    global _async_project_client, _async_credential
+    if _async_project_client is not None:
+        await _async_project_client.close()
+        _async_project_client = None
+    if _async_credential is not None:
+        await _async_credential.close()
+        _async_credential = None
+
+
+# Shared read-only "nothing discovered" result
+_EMPTY: Mapping = MappingProxyType({})
+
+
+def _take_newest(by_name: dict, agent) -> bool:
+    """Record *agent* if it is the first (newest) one seen for a known name.
+
+    Listing is requested newest-first, so the first hit per name wins.
+    Returns True once every known name has been found, letting callers
+    stop paging early.
+    """
+    if agent.name in AGENT_NAMES and agent.name not in by_name:
+        by_name[agent.name] = agent
+    return len(by_name) == len(AGENT_NAMES)
+
+
+def _build_result(by_name: dict) -> Mapping:
+    """Build an agent_ids-compatible mapping from the newest agent per known name.
 
     Returns the same structure that agent_ids.json used to provide::
 
@@ -80,156 +195,266 @@ def _discover_agents() -> dict:
             }
         }
 
-    If duplicates exist, picks the newest by created_at.
+    The result is cached and handed to every caller, so it is built
+    read-only (MappingProxyType / tuples) rather than copied per call.
     """
-    client = _get_project_client()
-    if client is None:
-        logger.warning(
-            "Cannot discover agents: PROJECT_ENDPOINT or "
-            "AI_FOUNDRY_PROJECT_NAME not set"
-        )
-        return {}
-
-    try:
-        all_agents = list(client.agents.list_agents(limit=100))
-    except Exception as e:
-        logger.error("Failed to list agents from Foundry: %s", e)
-        return {}
-
-    # Filter to known names; if duplicates, keep the newest
-    by_name: dict = {}
-    for agent in all_agents:
-        if agent.name in AGENT_NAMES:
-            if (
-                agent.name not in by_name
-                or agent.created_at > by_name[agent.name].created_at
-            ):
-                by_name[agent.name] = agent
-
     # Build agent_ids-compatible structure
     sub_agents: dict = {}
-    for name in (
-        "GraphExplorerAgent",
-        "TelemetryAgent",
-        "RunbookKBAgent",
-        "HistoricalTicketAgent",
-    ):
+    for name in _SUB_AGENT_ORDER:
         if name in by_name:
             a = by_name[name]
-            sub_agents[name] = {
+            sub_agents[name] = MappingProxyType({
                 "id": a.id,
                 "name": a.name,
                 "model": a.model,
                 "is_orchestrator": False,
-                "tools": [],
-                "connected_agents": [],
-            }
+                "tools": (),
+                "connected_agents": (),
+            })
 
     result: dict = {}
     orchestrator = by_name.get("Orchestrator")
     if orchestrator:
-        result["orchestrator"] = {
+        result["orchestrator"] = MappingProxyType({
             "id": orchestrator.id,
             "name": orchestrator.name,
             "model": orchestrator.model,
             "is_orchestrator": True,
-            "tools": [],
-            "connected_agents": list(sub_agents.keys()),
-        }
-    result["sub_agents"] = sub_agents
-    return result
+            "tools": (),
+            "connected_agents": tuple(sub_agents),
+        })
+    result["sub_agents"] = MappingProxyType(sub_agents)
+    return MappingProxyType(result)
 
 
-def _get_cached() -> dict:
-    """Return cached discovery result, refreshing if TTL expired."""
-    global _cache, _cache_time, _refresh_in_progress
+def _discover_agents() -> Mapping:
+    """Query AI Foundry (sync client) and return an agent_ids-compatible mapping."""
+    client = _get_project_client()
+    if client is None:
+        logger.warning(
+            "Cannot discover agents: PROJECT_ENDPOINT or "
+            "AI_FOUNDRY_PROJECT_NAME not set"
+        )
+        return _EMPTY
+
+    by_name: dict = {}
+    try:
+        for agent in client.agents.list_agents(limit=100, order="desc"):
+            if _take_newest(by_name, agent):
+                break
+    except Exception as e:
+        logger.error("Failed to list agents from Foundry: %s", e)
+        return _EMPTY
+    return _build_result(by_name)
+
+
+async def _discover_agents_async() -> Mapping:
+    """Query AI Foundry (async client) without blocking the event loop."""
+    client = _get_async_project_client()
+    if client is None:
+        logger.warning(
+            "Cannot discover agents: PROJECT_ENDPOINT or "
+            "AI_FOUNDRY_PROJECT_NAME not set"
+        )
+        return _EMPTY
+
+    by_name: dict = {}
+    try:
+        async for agent in client.agents.list_agents(limit=100, order="desc"):
+            if _take_newest(by_name, agent):
+                break
+    except Exception as e:
+        logger.error("Failed to list agents from Foundry: %s", e)
+        return _EMPTY
+    return _build_result(by_name)
+
+
+def _make_agent_stub(role: str, entry: Mapping) -> dict:
+    """Build a single agent stub from a discovery entry."""
+    agent = {
+        "id": entry["id"],
+        "name": entry.get("name", role),
+        "role": role,
+        "model": entry.get("model", ""),
+        "status": "provisioned",
+    }
+    if entry.get("tools"):
+        agent["tools"] = entry["tools"]
+    if entry.get("is_orchestrator"):
+        agent["is_orchestrator"] = True
+    if entry.get("connected_agents"):
+        agent["connected_agents"] = entry["connected_agents"]
+    return agent
+
+
+def _build_views(data: Mapping) -> tuple[Mapping[str, str], tuple[Mapping, ...]]:
+    """Derive the {id: name} map and /agents stub list from a discovery result.
+
+    Relies on the fixed shape _build_result() emits (orchestrator +
+    sub_agents) rather than walking arbitrary nesting.  Like the cache
+    itself, the views are shared between callers, so they are read-only.
+    """
+    orch = data.get("orchestrator")
+    entries = [("orchestrator", orch)] if orch else []
+    entries.extend(data.get("sub_agents", {}).items())
+    names = {entry["id"]: entry["name"] for _, entry in entries}
+    agents = tuple(MappingProxyType(_make_agent_stub(role, entry)) for role, entry in entries)
+    return MappingProxyType(names), agents
+
+
+def _check_cache() -> tuple[Mapping | None, threading.Event | None]:
+    """Check the cache, claiming the refresh if nobody else holds it.
+
+    Returns:
+        (cache, None)  — cache is usable; past 80% of the TTL a background
+                         refresh is also started.
+        (None, event)  — the cache is cold and another caller is already
+                         filling it; wait on ``event`` then read the cache.
+        (None, None)   — the caller now owns the refresh and must call
+                         _finish_refresh() when done.
+    """
+    global _refresh_event
+    # Lock-free fast path for a fresh cache.  _finish_refresh() publishes
+    # _cache before _cache_time, so reading the time first never pairs a
+    # fresh timestamp with an older cache.
+    cache_time, ttl = _cache_time, _cache_ttl_effective
+    cache = _cache
+    if cache is not None and time.monotonic() - cache_time < ttl * 0.8:
+        return cache, None
+
     with _cache_lock:
-        now = time.time()
-        if _cache is not None and (now - _cache_time) < _CACHE_TTL:
-            return _cache
-        # Prevent thundering herd: if another thread is refreshing, return stale
-        if _refresh_in_progress and _cache is not None:
-            return _cache
-        _refresh_in_progress = True
+        age = time.monotonic() - _cache_time
+        if _cache is not None and age < _cache_ttl_effective:
+            # Past 80% of the TTL: refresh in the background
+            if age >= _cache_ttl_effective * 0.8 and _refresh_event is None:
+                _refresh_event = threading.Event()
+                threading.Thread(target=_background_refresh, daemon=True).start()
+            return _cache, None
+        if _refresh_event is not None:
+            # Stale cache: serve it rather than wait; cold cache: wait
+            if _cache is not None:
+                return _cache, None
+            return None, _refresh_event
+        _refresh_event = threading.Event()
+    return None, None
+
+
+def _finish_refresh(result: Mapping | None) -> None:
+    """Store a refresh result (if any) and wake any waiting callers."""
+    global _cache, _cache_time, _cache_ttl_effective, _refresh_event
+    global _views
+    if result is not None:
+        names, agents = _build_views(result)
+    with _cache_lock:
+        if result is not None:
+            _cache = result
+            _views = (result, names, agents)
+            _cache_time = time.monotonic()
+            found = result.get("orchestrator") or result.get("sub_agents")
+            base_ttl = _CACHE_TTL if found else _EMPTY_TTL
+            _cache_ttl_effective = base_ttl * (0.9 + 0.2 * random.random())
+        event, _refresh_event = _refresh_event, None
+    if event is not None:
+        event.set()
+
+
+def _background_refresh() -> None:
+    """Repopulate the cache off the request path (soft-TTL refresh)."""
+    result = None
+    try:
+        result = _discover_agents()
+    finally:
+        _finish_refresh(result)
+
+
+def _get_cached() -> Mapping:
+    """Return cached discovery result, refreshing if TTL expired."""
+    cached, pending = _check_cache()
+    if cached is not None:
+        return cached
+    if pending is not None:
+        pending.wait(timeout=_REFRESH_WAIT_TIMEOUT)
+        return _cache if _cache is not None else _EMPTY
     # Refresh outside the lock (network call)
+    result = None
     try:
         result = _discover_agents()
-        with _cache_lock:
-            _cache = result
-            _cache_time = time.time()
     finally:
-        with _cache_lock:
-            _refresh_in_progress = False
+        _finish_refresh(result)
+    return result
+
+
+async def _get_cached_async() -> Mapping:
+    """Async variant of _get_cached — refreshes without blocking the event loop."""
+    cached, pending = _check_cache()
+    if cached is not None:
+        return cached
+    if pending is not None:
+        await asyncio.to_thread(pending.wait, _REFRESH_WAIT_TIMEOUT)
+        return _cache if _cache is not None else _EMPTY
+    result = None
+    try:
+        try:
+            result = await _discover_agents_async()
+        except ImportError:
+            # No async transport installed — run the sync client off-loop
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, _discover_agents)
+    finally:
+        _finish_refresh(result)
     return result
 
 
 def invalidate_cache() -> None:
     """Force the next call to re-query Foundry."""
-    global _cache, _cache_time
+    global _cache, _cache_time, _views
     with _cache_lock:
         _cache = None
         _cache_time = 0.0
+        _views = (None, MappingProxyType({}), ())
 
 
 # ---------------------------------------------------------------------------
-# Public API — same signatures as the old file-based implementation
+# Public API — load the discovery mapping once (load_agent_ids_async() from
+# async code, load_agent_ids() from threads), then derive the read-only
+# name map / agent stubs from it with get_agent_names() / get_agent_list()
 # ---------------------------------------------------------------------------
 
 
-def load_agent_ids() -> dict:
-    """Return the full agent discovery dict (cached with TTL)."""
+def load_agent_ids() -> Mapping:
+    """Return the full agent discovery mapping (cached with TTL, read-only).
+
+    Blocks on a cache miss — from async code use load_agent_ids_async().
+    """
     return _get_cached()
 
 
-def get_agent_names() -> dict[str, str]:
-    """Return {agent_id: agent_name} mapping.
+async def load_agent_ids_async() -> Mapping:
+    """Async variant of load_agent_ids() for FastAPI handlers."""
+    return await _get_cached_async()
+
+
+def _views_for(data: Mapping) -> tuple[Mapping[str, str], tuple[Mapping, ...]]:
+    """Views for a discovery mapping — shared if it is the current fill."""
+    source, names, agents = _views
+    if source is data:
+        return names, agents
+    # A fill (or invalidate) landed since the caller loaded ``data``
+    return _build_views(data)
+
 
-    Handles both flat and nested (sub_agents) structures.
+def get_agent_names(data: Mapping) -> Mapping[str, str]:
+    """Return the read-only {agent_id: agent_name} map for a discovery result.
+
+    Pass the mapping from load_agent_ids_async() (or load_agent_ids()), so
+    callers never re-enter the cache; built once per cache fill.
     """
-    data = _get_cached()
-    names: dict[str, str] = {}
-    for key, val in data.items():
-        if isinstance(val, dict) and "id" in val:
-            names[val["id"]] = val.get("name", key)
-        elif isinstance(val, dict):
-            for sub_key, sub_val in val.items():
-                if isinstance(sub_val, dict) and "id" in sub_val:
-                    names[sub_val["id"]] = sub_val.get("name", sub_key)
-    return names
-
-
-def _make_agent_stub(role: str, entry: dict) -> dict:
-    """Build a single agent stub from a discovery entry."""
-    agent = {
-        "id": entry["id"],
-        "name": entry.get("name", role),
-        "role": role,
-        "model": entry.get("model", ""),
-        "status": "provisioned",
-    }
-    if entry.get("tools"):
-        agent["tools"] = entry["tools"]
-    if entry.get("is_orchestrator"):
-        agent["is_orchestrator"] = True
-    if entry.get("connected_agents"):
-        agent["connected_agents"] = entry["connected_agents"]
-    return agent
+    return _views_for(data)[0]
 
 
-def get_agent_list() -> list[dict]:
-    """Return list of agent stubs for the /agents endpoint.
+def get_agent_list(data: Mapping) -> Sequence[Mapping]:
+    """Return read-only agent stubs for the /agents endpoint from a discovery result.
 
-    Handles both flat and nested (sub_agents) structures.
+    Takes the mapping from load_agent_ids_async() like get_agent_names().
     """
-    data = _get_cached()
-    if not data:
-        return []
-    agents = []
-    for key, val in data.items():
-        if isinstance(val, dict) and "id" in val:
-            agents.append(_make_agent_stub(key, val))
-        elif isinstance(val, dict):
-            for sub_key, sub_val in val.items():
-                if isinstance(sub_val, dict) and "id" in sub_val:
-                    agents.append(_make_agent_stub(sub_key, sub_val))
-    return agents
+    return _views_for(data)[1]
@@ -51,6 +51,37 @@ def dispatch_field_engineer(
     Returns:
         JSON string with dispatch confirmation including a composed email body.
     """
+    return json.dumps(compose_dispatch(
+        engineer_name=engineer_name,
+        engineer_email=engineer_email,
+        engineer_phone=engineer_phone,
+        incident_summary=incident_summary,
+        destination_description=destination_description,
+        destination_latitude=destination_latitude,
+        destination_longitude=destination_longitude,
+        physical_signs_to_inspect=physical_signs_to_inspect,
+        sensor_ids=sensor_ids,
+        urgency=urgency,
+    ))
+
+
+def compose_dispatch(
+    engineer_name: str,
+    engineer_email: str,
+    engineer_phone: str,
+    incident_summary: str,
+    destination_description: str,
+    destination_latitude: float,
+    destination_longitude: float,
+    physical_signs_to_inspect: str,
+    sensor_ids: str,
+    urgency: str = "HIGH",
+) -> dict:
+    """Build the dispatch confirmation dict that dispatch_field_engineer returns as JSON.
+
+    Exposed separately so in-process callers can keep the dict without a
+    JSON round-trip.
+    """
 
     dispatch_time = datetime.now(timezone.utc).isoformat()
     dispatch_id = f"DISPATCH-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
@@ -135,4 +166,4 @@ This dispatch was generated automatically by the Network AI Orchestrator.
         "email_body": email_body,
     }
 
-    return json.dumps(result)
+    return result
@@ -6,17 +6,19 @@ Serves:
   - Health check at /health
 
 Run locally:
-  cd api && uv run uvicorn app.main:app --reload --port 8000
+  cd api && uv run uvicorn app.main:app --reload --port 8000 --loop uvloop --http httptools
 """
 
+import asyncio
 import logging
 import os
-import time as _time
 from contextlib import asynccontextmanager
+from time import monotonic, perf_counter
 
-from dotenv import load_dotenv
-from fastapi import FastAPI, Request
+import httpx
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 # Configure logging BEFORE importing routers (logs.py adds a handler
 # to the root logger at import time; if basicConfig runs after that,
@@ -24,16 +26,41 @@ from fastapi.middleware.cors import CORSMiddleware
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 logging.getLogger("app").setLevel(logging.DEBUG)
 
+from app.paths import Settings  # noqa: E402
 from app.routers import agents, logs, config, sessions  # noqa: E402
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: recover orphaned sessions
+    # Startup: warm the agent cache in the background (so the first
+    # /api/agents or alert doesn't pay the Foundry round-trip), then
+    # recover orphaned sessions
+    from app.agent_ids import close_clients, load_agent_ids_async
+    from app.orchestrator import close_project_client
+    from app.paths import settings
     from app.session_manager import session_manager
+    app.state.settings = settings
+    preload = asyncio.create_task(load_agent_ids_async())
+    # Shared keep-alive client for /api/services/health probes
+    app.state.probe_client = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(
+            max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0,
+        ),
+        http2=True,
+    )
+    # Resolve and connect to the probed hosts now, so the first
+    # /api/services/health call doesn't pay DNS + TLS for each of them
+    prewarm = asyncio.create_task(_prewarm_probe_hosts(app.state.probe_client, settings))
     await session_manager.recover_from_cosmos()
     yield
-    # Shutdown: no cleanup needed (sessions persist to Cosmos on finalize)
+    # Shutdown: sessions persist to Cosmos on finalize; just close clients
+    for task in (preload, prewarm):
+        if not task.done():
+            task.cancel()
+    await app.state.probe_client.aclose()
+    await close_project_client()
+    await close_clients()
 
 
 app = FastAPI(
@@ -43,11 +70,16 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS — configurable via CORS_ORIGINS env var (comma-separated list)
-_cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000")
+# CORS — configurable via CORS_ORIGINS env var (comma-separated list).
+# A frozenset so Starlette's per-request origin check is a hash lookup.
+_cors_origins = frozenset(
+    o.strip()
+    for o in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
+    if o.strip()
+)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[o.strip() for o in _cors_origins.split(",")],
+    allow_origins=_cors_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
@@ -62,98 +94,174 @@ app.include_router(sessions.router)
 logger = logging.getLogger("app")
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log every incoming request with timing info."""
-    logger.info("▶ %s %s", request.method, request.url.path)
-    t0 = _time.time()
-    response = await call_next(request)
-    elapsed_ms = (_time.time() - t0) * 1000
-    if response.status_code >= 400:
-        logger.warning(
-            "◀ %s %s → %d  (%.0fms)",
-            request.method, request.url.path, response.status_code, elapsed_ms,
-        )
-    else:
-        logger.info(
-            "◀ %s %s → %d  (%.0fms)",
-            request.method, request.url.path, response.status_code, elapsed_ms,
-        )
-    return response
+# High-frequency polling/probe paths — not worth a log line per hit
+_LOG_SKIP_PATHS = frozenset({"/health", "/favicon.ico", "/api/services/health"})
+
+
+class LogRequestsMiddleware:
+    """Log every incoming request with timing info.
+
+    Pure ASGI (rather than @app.middleware("http") / BaseHTTPMiddleware),
+    so requests — including long-lived SSE streams — aren't wrapped in an
+    extra task and memory-stream bridge.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in _LOG_SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method, path = scope["method"], scope["path"]
+        logger.info("▶ %s %s", method, path)
+        status_code = 500  # if the app raises before starting a response
+        t0 = perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (perf_counter() - t0) * 1000.0
+            log = logger.warning if status_code >= 400 else logger.info
+            log("◀ %s %s → %d  (%.0fms)", method, path, status_code, elapsed_ms)
+
+
+app.add_middleware(LogRequestsMiddleware)
+
+
+# Static body, serialized once — /health is the most frequently hit route
+_HEALTH_BYTES = b'{"status":"ok","service":"autonomous-network-noc-api"}'
 
 
 @app.get("/health")
 async def health():
     """Simple health check."""
-    return {"status": "ok", "service": "autonomous-network-noc-api"}
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+
+# Aggregated probe result, reused for HEALTH_CACHE_TTL_SECONDS so polling
+# dashboards (and several open tabs) share one upstream fan-out.
+_HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL_SECONDS", "5"))
+_health_cache: dict = {"ts": 0.0, "value": None}
+_health_lock = asyncio.Lock()
+# Overall deadline for one probe fan-out; unfinished probes report "timeout"
+_HEALTH_DEADLINE = float(os.getenv("SERVICE_HEALTH_DEADLINE_SECONDS", "3"))
+
+
+@app.get("/api/services/health", response_class=ORJSONResponse)
+async def services_health(request: Request):
+    """Service connectivity summary with real probes (briefly cached)."""
+    def _fresh() -> bool:
+        return (
+            _health_cache["value"] is not None
+            and monotonic() - _health_cache["ts"] < _HEALTH_CACHE_TTL
+        )
 
+    if _fresh():
+        return _health_cache["value"]
+    async with _health_lock:
+        # Re-check: a concurrent caller may have refreshed while we waited
+        if _fresh():
+            return _health_cache["value"]
+        value = await _probe_services(
+            request.app.state.probe_client, request.app.state.settings,
+        )
+        _health_cache["value"], _health_cache["ts"] = value, monotonic()
+        return value
+
+
+async def _prewarm_probe_hosts(client: httpx.AsyncClient, settings: Settings) -> None:
+    """Open pooled connections to each configured service endpoint (best effort)."""
+    endpoints = [
+        ep.rstrip("/")
+        for ep in (settings.project_endpoint, settings.azure_search_endpoint, settings.cosmos_endpoint)
+        if ep
+    ]
+    await asyncio.gather(
+        *(client.head(ep, timeout=5.0) for ep in endpoints), return_exceptions=True,
+    )
 
-@app.get("/api/services/health")
-async def services_health():
-    """Service connectivity summary with real probes."""
-    import httpx
-    import asyncio
 
+async def _probe_services(client: httpx.AsyncClient, settings: Settings) -> dict:
+    """Probe each backing service concurrently and summarise the results."""
     async def _probe(name: str, check_fn):
-        t0 = _time.time()
+        t0 = perf_counter()
         try:
             result = await check_fn()
-            latency = int((_time.time() - t0) * 1000)
+            latency = int((perf_counter() - t0) * 1000)
             return {"name": name, "status": "connected", "details": result or "", "latency_ms": latency}
         except Exception as e:
-            latency = int((_time.time() - t0) * 1000)
+            latency = int((perf_counter() - t0) * 1000)
             return {"name": name, "status": "error", "details": str(e)[:200], "latency_ms": latency}
 
     # AI Foundry — try reaching the endpoint
     async def _check_foundry():
-        ep = os.getenv("PROJECT_ENDPOINT", "")
+        ep = settings.project_endpoint
         if not ep:
             raise Exception("PROJECT_ENDPOINT not configured")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.get(ep.rstrip("/"))
-        return os.getenv("AI_FOUNDRY_NAME", ep.split("//")[-1].split(".")[0])
+        await client.head(ep.rstrip("/"), timeout=5.0)  # reachability only — skip the body
+        return settings.ai_foundry_name or ep.split("//")[-1].split(".")[0]
 
     # AI Search — HEAD to the service endpoint
     async def _check_search():
-        endpoint = os.getenv("AZURE_SEARCH_ENDPOINT", "") or os.getenv("AI_SEARCH_ENDPOINT", "")
+        endpoint = settings.azure_search_endpoint
         if not endpoint:
             raise Exception("AI Search endpoint not configured")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(f"{endpoint}/indexes?api-version=2024-07-01&$top=0",
-                                    headers={"api-key": os.getenv("AZURE_SEARCH_KEY", "")})
-            if resp.status_code >= 400:
-                raise Exception(f"HTTP {resp.status_code}")
-        return os.getenv("AI_SEARCH_NAME", endpoint.split("//")[-1].split(".")[0])
+        resp = await client.get(f"{endpoint}/indexes?api-version=2024-07-01&$top=0",
+                                headers={"api-key": settings.azure_search_key})
+        if resp.status_code >= 400:
+            raise Exception(f"HTTP {resp.status_code}")
+        return settings.ai_search_name or endpoint.split("//")[-1].split(".")[0]
 
     # Cosmos DB — ping the database endpoint
     async def _check_cosmos():
-        cosmos_ep = os.getenv("COSMOS_NOSQL_ENDPOINT", "")
+        cosmos_ep = settings.cosmos_endpoint
         if not cosmos_ep:
             raise Exception("COSMOS_NOSQL_ENDPOINT not configured")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.get(cosmos_ep.rstrip("/"))
+        await client.head(cosmos_ep.rstrip("/"), timeout=5.0)
         return "NoSQL interactions store"
 
     # Graph Query API — hit the new liveness probe
     async def _check_gql_api():
-        gq = os.getenv("GRAPH_QUERY_API_URI", "http://localhost:8100")
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(f"{gq.rstrip('/')}/query/health")
-            if resp.status_code >= 400:
-                raise Exception(f"HTTP {resp.status_code}")
+        gq = settings.graph_query_api_uri
+        resp = await client.get(f"{gq.rstrip('/')}/query/health", follow_redirects=False)
+        if resp.status_code >= 400:
+            raise Exception(f"HTTP {resp.status_code}")
         return "Fabric GQL"
 
-    probes = await asyncio.gather(
-        _probe("AI Foundry", _check_foundry),
-        _probe("AI Search", _check_search),
-        _probe("Cosmos DB", _check_cosmos),
-        _probe("Graph Query API", _check_gql_api),
-        return_exceptions=False,
-    )
+    tasks = {
+        name: asyncio.create_task(_probe(name, fn))
+        for name, fn in (
+            ("AI Foundry", _check_foundry),
+            ("AI Search", _check_search),
+            ("Cosmos DB", _check_cosmos),
+            ("Graph Query API", _check_gql_api),
+        )
+    }
+    # Bound the endpoint by a deadline instead of the slowest probe
+    _, pending = await asyncio.wait(tasks.values(), timeout=_HEALTH_DEADLINE)
+    for task in pending:
+        task.cancel()
 
-    services = list(probes)
+    services = [
+        {
+            "name": name,
+            "status": "timeout",
+            "details": "deadline exceeded",
+            "latency_ms": int(_HEALTH_DEADLINE * 1000),
+        }
+        if task in pending else task.result()
+        for name, task in tasks.items()
+    ]
     connected = sum(1 for s in services if s["status"] == "connected")
-    error_count = sum(1 for s in services if s["status"] == "error")
+    error_count = len(services) - connected  # errors + timeouts
 
     return {
         "services": services,
@@ -161,13 +269,14 @@ async def services_health():
     }
 
 
-@app.get("/api/services/models")
-async def services_models():
+@app.get("/api/services/models", response_class=ORJSONResponse)
+async def services_models(request: Request):
     """List deployed model names from AI Foundry."""
     models = []
 
-    model_name = os.getenv("MODEL_DEPLOYMENT_NAME", "")
-    embedding_name = os.getenv("EMBEDDING_MODEL", "")
+    settings = request.app.state.settings
+    model_name = settings.model_deployment_name
+    embedding_name = settings.embedding_model
     if model_name:
         models.append({"name": model_name, "type": "llm", "status": "ready"})
     if embedding_name:
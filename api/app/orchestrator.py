@@ -1,43 +1,47 @@
 """
-Orchestrator bridge — runs the Foundry Orchestrator agent in a background
-thread and yields SSE events via an async generator.
+Orchestrator bridge — runs the Foundry Orchestrator agent and yields SSE
+events via an async generator.
 
-The Azure AI Agents SDK uses a synchronous callback-based streaming API
-(AgentEventHandler). This module bridges it to async SSE by:
-  1. Running the agent stream in a daemon thread
-  2. Pushing SSE-shaped dicts to an asyncio.Queue from the callbacks
-  3. Yielding from the queue in an async generator for EventSourceResponse
+Uses the async Azure AI Agents SDK (AsyncAgentEventHandler) on the app's
+event loop:
+  1. Callbacks buffer SSE-shaped dicts on a per-run deque
+  2. The generator iterates the run stream itself and yields whatever the
+     callbacks buffered after each stream event
 
 Falls back to stub responses when the orchestrator isn't configured
 (missing env vars or no agents provisioned in Foundry).
 """
 
-import asyncio
 import ast
+import asyncio
 import json
 import logging
-import os
 import re
 import threading
+import itertools
+import secrets
 import time
-import uuid
+from collections import deque
+from collections.abc import Mapping
+from contextvars import ContextVar
 from datetime import datetime, timezone
 from typing import AsyncGenerator
 
-import app.paths  # noqa: F401  # side-effect: loads .env
-from app.agent_ids import load_agent_ids, get_agent_names
-
-logger = logging.getLogger(__name__)
+import orjson
+from azure.ai.agents.models import AsyncAgentEventHandler, AsyncFunctionTool, AsyncToolSet
+from azure.ai.projects.aio import AIProjectClient
 
-# Cached credential singleton — shared with agent_ids module
-_credential = None
+from app.paths import settings
+from app.agent_ids import (
+    get_agent_names,
+    get_async_credential,
+    load_agent_ids,
+    load_agent_ids_async,
+    normalized_endpoint,
+)
+from app.dispatch import compose_dispatch, dispatch_field_engineer
 
-def _get_credential():
-    global _credential
-    if _credential is None:
-        from azure.identity import DefaultAzureCredential
-        _credential = DefaultAzureCredential()
-    return _credential
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -46,9 +50,9 @@ def _get_credential():
 
 def is_configured() -> bool:
     """Check whether the Foundry orchestrator is ready to use."""
-    if not os.environ.get("PROJECT_ENDPOINT"):
+    if not settings.project_endpoint:
         return False
-    if not os.environ.get("AI_FOUNDRY_PROJECT_NAME"):
+    if not settings.ai_foundry_project_name:
         return False
     try:
         data = load_agent_ids()
@@ -59,31 +63,268 @@ def is_configured() -> bool:
     return True
 
 
-def _load_orchestrator_id() -> str:
-    return load_agent_ids()["orchestrator"]["id"]
+async def _load_orchestrator_id() -> str:
+    return (await load_agent_ids_async())["orchestrator"]["id"]
 
 
-def _load_agent_names() -> dict[str, str]:
+async def _load_agent_names() -> Mapping[str, str]:
     """Map of agent_id → display name for resolving connected-agent calls."""
-    return get_agent_names()
+    return get_agent_names(await load_agent_ids_async())
+
+
+# Per-session capture of FunctionTool outputs. The toolset is registered on
+# the shared client once, so the wrapper finds the calling session's dict
+# through a context variable (each session streams in its own task).
+# The dict is cached as built, so the run-step handler needn't parse back
+# the JSON string the agent receives.
+_fn_output_cache: ContextVar[dict[str, dict | str] | None] = ContextVar("_fn_output_cache", default=None)
+
 
+def _wrapped_dispatch(**kwargs):
+    result = compose_dispatch(**kwargs)
+    cache = _fn_output_cache.get()
+    if cache is not None:
+        cache["dispatch_field_engineer"] = result
+    return json.dumps(result)
 
-def _get_project_client():
-    """Create an AIProjectClient with the project-scoped endpoint."""
-    from azure.ai.projects import AIProjectClient
 
-    endpoint = os.environ.get("PROJECT_ENDPOINT", "")
-    project_name = os.environ.get("AI_FOUNDRY_PROJECT_NAME", "")
-    if not endpoint or not project_name:
-        raise RuntimeError(
-            "PROJECT_ENDPOINT and AI_FOUNDRY_PROJECT_NAME must be set"
+_wrapped_dispatch.__name__ = "dispatch_field_engineer"
+_wrapped_dispatch.__doc__ = dispatch_field_engineer.__doc__
+
+_project_client: AIProjectClient | None = None
+
+
+def _get_project_client() -> AIProjectClient:
+    """Return the process-wide async AIProjectClient for the project-scoped endpoint.
+
+    Built once on first use (with FunctionTool auto-execution for dispatch
+    actions enabled). Closed by close_project_client() on app shutdown.
+    """
+    global _project_client
+    if _project_client is None:
+        endpoint = settings.project_endpoint
+        project_name = settings.ai_foundry_project_name
+        if not endpoint or not project_name:
+            raise RuntimeError(
+                "PROJECT_ENDPOINT and AI_FOUNDRY_PROJECT_NAME must be set"
+            )
+        client = AIProjectClient(
+            endpoint=normalized_endpoint(endpoint, project_name),
+            credential=get_async_credential(),
         )
-    endpoint = endpoint.rstrip("/")
-    # Ensure endpoint uses services.ai.azure.com and has /api/projects/ path
-    if "/api/projects/" not in endpoint:
-        endpoint = endpoint.replace("cognitiveservices.azure.com", "services.ai.azure.com")
-        endpoint = f"{endpoint}/api/projects/{project_name}"
-    return AIProjectClient(endpoint=endpoint, credential=_get_credential())
+        toolset = AsyncToolSet()
+        toolset.add(AsyncFunctionTool(functions={_wrapped_dispatch}))
+        client.agents.enable_auto_function_calls(toolset)
+        _project_client = client
+    return _project_client
+
+
+async def close_project_client() -> None:
+    """Close the shared orchestrator client (FastAPI shutdown hook)."""
+    global _project_client
+    if _project_client is not None:
+        await _project_client.close()
+        _project_client = None
+
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO-8601 string (the SSE timestamp format)."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+_MISSING = object()
+
+
+def _attr(obj, name: str, default=None):
+    """Read a field from an SDK model or a plain dict (tool calls arrive as either)."""
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    value = getattr(obj, name, _MISSING)
+    return obj.get(name, default) if value is _MISSING else value
+
+
+# SSE message / tool-call IDs: a per-process random prefix plus a counter.
+# Unique within the process and collision-resistant across replicas,
+# without an os.urandom call per event.
+_ID_NONCE = secrets.token_hex(6)
+_id_counter = itertools.count()
+
+
+def _new_id() -> str:
+    return f"{_ID_NONCE}-{next(_id_counter):x}"
+
+
+def _enum_str(v) -> str:
+    """Plain string for an SDK enum member (or anything else)."""
+    v = getattr(v, "value", v)
+    return v if isinstance(v, str) else str(v)
+
+
+def _tool_call_parts(tc) -> tuple[str, object]:
+    """Return (type, payload) for a tool call, read once per call.
+
+    The payload (arguments, output, name) lives under an attribute named
+    after the type, e.g. tc.connected_agent or tc.function.
+    """
+    tc_type = _enum_str(_attr(tc, "type", "?"))
+    return tc_type, _attr(tc, tc_type, {})
+
+
+# message.delta coalescing: flush once the buffer holds this many chars or
+# this long has passed since the last flush
+_DELTA_FLUSH_CHARS = 256
+_DELTA_FLUSH_INTERVAL = 0.025
+
+
+# ---------------------------------------------------------------------------
+# Sub-agent output parsing patterns
+# ---------------------------------------------------------------------------
+
+_THINKING_TAG = "[ORCHESTRATOR_THINKING]"
+_THINKING_RE = re.compile(
+    r'\[ORCHESTRATOR_THINKING\](.*?)\[/ORCHESTRATOR_THINKING\]',
+    flags=re.DOTALL,
+)
+
+
+def _clip(text: str, limit: int) -> str:
+    """Truncate text to limit chars, marking the cut with an ellipsis."""
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _split_thinking(raw: str) -> tuple[str, str]:
+    """Split an [ORCHESTRATOR_THINKING] block out of tool-call arguments.
+
+    Returns (query, reasoning); reasoning is capped at 500 chars.
+    """
+    # Most arguments carry no thinking block; a substring test is far
+    # cheaper than a regex search for that common case
+    if _THINKING_TAG not in raw:
+        return raw, ""
+    match = _THINKING_RE.search(raw)
+    if not match:
+        return raw, ""
+    reasoning = _clip(match.group(1).strip(), 500)
+    return (raw[:match.start()] + raw[match.end():]).strip(), reasoning
+
+
+def _strip_thinking(text: str) -> str:
+    """Remove any [ORCHESTRATOR_THINKING] blocks from a final response."""
+    if _THINKING_TAG not in text:
+        return text.strip()
+    return _THINKING_RE.sub('', text).strip()
+
+
+# Final replies above this size are stripped in a worker thread so a very
+# long answer doesn't stall other sessions' streams on the event loop
+_STRIP_OFFLOAD_CHARS = 64 * 1024
+
+
+async def _strip_thinking_async(text: str) -> str:
+    if len(text) < _STRIP_OFFLOAD_CHARS or _THINKING_TAG not in text:
+        return _strip_thinking(text)
+    return await asyncio.to_thread(_strip_thinking, text)
+
+
+def _function_args_text(args_raw) -> str:
+    """Render FunctionTool arguments — dicts pretty-printed as JSON."""
+    try:
+        obj = orjson.loads(args_raw) if isinstance(args_raw, str) else args_raw
+        if isinstance(obj, dict):
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        return str(obj)
+    except Exception:
+        return str(args_raw)
+
+
+def _connected_args_text(args_raw) -> str:
+    """Render connected-agent arguments — a lone query/input value is unwrapped."""
+    try:
+        obj = orjson.loads(args_raw) if isinstance(args_raw, str) else args_raw
+        if isinstance(obj, str):
+            return obj
+        if isinstance(obj, dict) and len(obj) == 1:
+            for key in ("query", "input"):
+                if key in obj:
+                    return str(obj[key])
+        return json.dumps(obj)
+    except Exception:
+        return str(args_raw)
+
+
+# Tool-call type → argument renderer; other types carry no displayable args
+_ARGS_FORMATTERS = {
+    "function": _function_args_text,
+    "connected_agent": _connected_args_text,
+}
+
+# Sub-agent → visualization type for structured query results
+_VIZ_TYPES = {
+    "GraphExplorerAgent": "graph",
+    "TelemetryAgent": "table",
+}
+# Knowledge-base agents whose plain output is shown as a document
+_KB_AGENTS = frozenset({"RunbookKBAgent", "HistoricalTicketAgent", "AzureAISearch"})
+
+# Lower-cased substrings marking a Fabric capacity / throttling failure
+_CAPACITY_MARKERS = (
+    "429", "capacity", "circuit breaker", "throttl",
+    "fabric capacity", "too many requests", "503",
+)
+
+
+def _is_capacity_error(error_text: str) -> bool:
+    """Check if an error message indicates Fabric capacity exhaustion."""
+    lower = error_text.lower()
+    return any(m in lower for m in _CAPACITY_MARKERS)
+
+
+_SECTION_RE = re.compile(r'---(QUERY|RESULTS|ANALYSIS|CITATIONS)---')
+
+
+def _scan_sections(raw_output: str) -> tuple[list[tuple[str, str]], str | None, str | None]:
+    """Split delimited sub-agent output in one forward pass over its markers.
+
+    Returns (query_blocks, analysis, citations): query_blocks is a list of
+    (query, results) pairs — results run until the next ---QUERY--- or
+    ---ANALYSIS---; analysis is everything after the first ---ANALYSIS---;
+    citations sit between the first ---CITATIONS--- and the ---ANALYSIS---
+    after it. All text is stripped; missing sections are None.
+    """
+    query_blocks: list[tuple[str, str]] = []
+    analysis = citations = None
+    if "---" not in raw_output:  # plain prose — no markers to find
+        return query_blocks, analysis, citations
+    query_start = None             # body start of a ---QUERY--- awaiting ---RESULTS---
+    open_results = None            # (query, body start) of the block being read
+    citations_start = None
+    seen_analysis = False
+
+    for m in _SECTION_RE.finditer(raw_output):
+        name, start, end = m.group(1), m.start(), m.end()
+        if open_results and name in ("QUERY", "ANALYSIS"):
+            query_blocks.append((open_results[0], raw_output[open_results[1]:start].strip()))
+            open_results = None
+        if name == "QUERY":
+            if query_start is None:
+                query_start = end
+        elif name == "RESULTS":
+            if query_start is not None:
+                open_results = (raw_output[query_start:start].strip(), end)
+                query_start = None
+        elif name == "ANALYSIS":
+            if citations_start is not None and citations is None:
+                citations = raw_output[citations_start:start].strip()
+            if not seen_analysis:
+                seen_analysis = True
+                if end < len(raw_output):
+                    analysis = raw_output[end:].strip()
+        elif citations_start is None:  # CITATIONS
+            citations_start = end
+
+    if open_results:
+        query_blocks.append((open_results[0], raw_output[open_results[1]:].strip()))
+    return query_blocks, analysis, citations
 
 
 # ---------------------------------------------------------------------------
@@ -100,23 +341,20 @@ async def run_orchestrator_session(
     Single entry point for both initial and follow-up turns.
     Supports cancel_event and thread reuse for multi-turn sessions.
     """
-    from azure.ai.agents.models import AgentEventHandler
-
-    orchestrator_id = _load_orchestrator_id()
-    agent_names = _load_agent_names()
-    loop = asyncio.get_running_loop()
-    queue: asyncio.Queue = asyncio.Queue()
+    orchestrator_id = await _load_orchestrator_id()
+    agent_names = await _load_agent_names()
+    pending: deque[dict] = deque()
 
     def _put(event: str, data: dict):
-        """Thread-safe enqueue of an SSE event dict."""
-        asyncio.run_coroutine_threadsafe(
-            queue.put({"event": event, "data": json.dumps(data)}),
-            loop,
-        )
+        """Buffer an SSE event dict; yielded at the next drain point."""
+        pending.append({
+            "event": event,
+            "data": orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode(),
+        })
 
     # -- Handler (single unified class) --------------------------------------
 
-    class SSEEventHandler(AgentEventHandler):
+    class SSEEventHandler(AsyncAgentEventHandler):
         """Converts AgentEventHandler callbacks to new-schema SSE events."""
 
         def __init__(self):
@@ -126,22 +364,33 @@ async def run_orchestrator_session(
             self._pending_steps: dict[str, dict] = {}  # step_id → {tc_id → metadata}
             self.ui_step = 0
             self.total_tokens = 0
-            self.response_text = ""
+            self._response_parts: list[str] = []
+            self.run_id: str | None = None
             self.run_failed = False
             self.run_error_detail = ""
-            self._last_fn_output: dict[str, str] = {}
+            self._last_fn_output: dict[str, dict | str] = {}
             self._message_id: str | None = None
+            self._delta_prefix = ""  # '{"id":<id>,"text":' — encoded once per message
             self._message_started = False
+            self._delta_buf: list[str] = []
+            self._delta_chars = 0
+            self._last_delta_flush = 0.0
+
+        @property
+        def response_text(self) -> str:
+            """Full assistant reply streamed so far (joined on demand)."""
+            return "".join(self._response_parts)
 
         def _elapsed(self) -> str:
             return f"{time.monotonic() - self.t0:.1f}s"
 
         # -- Run lifecycle ---------------------------------------------------
 
-        def on_thread_run(self, run):
-            s = run.status
-            status = s.value if hasattr(s, "value") else str(s)
+        async def on_thread_run(self, run):
+            self.flush_deltas()
+            status = _enum_str(run.status)
             logger.info("on_thread_run: status=%s", status)
+            self.run_id = run.id
 
             if status == "completed" and run.usage:
                 self.total_tokens = getattr(run.usage, "total_tokens", 0) or 0
@@ -151,8 +400,8 @@ async def run_orchestrator_session(
                     code = "unknown"
                     msg = "Run failed with no error details"
                 else:
-                    code = getattr(err, "code", None) or (err.get("code") if isinstance(err, dict) else None) or "unknown"
-                    msg = getattr(err, "message", None) or (err.get("message") if isinstance(err, dict) else str(err))
+                    code = _attr(err, "code") or "unknown"
+                    msg = _attr(err, "message") or str(err)
                 self.run_failed = True
                 self.run_error_detail = f"[{code}] {msg}"
                 logger.error(
@@ -162,89 +411,32 @@ async def run_orchestrator_session(
 
         # -- Helpers for tool call resolution --------------------------------
 
-        def _resolve_agent_name(self, tc) -> str:
-            """Resolve agent name from a tool call object."""
-            tc_t = tc.type if hasattr(tc, "type") else tc.get("type", "?")
-            tc_type = tc_t.value if hasattr(tc_t, "value") else str(tc_t)
+        def _resolve_agent_name(self, tc_type: str, payload) -> str:
+            """Resolve agent name from a tool call's type and payload."""
             if tc_type == "connected_agent":
-                ca = tc.connected_agent if hasattr(tc, "connected_agent") else tc.get("connected_agent", {})
-                name = getattr(ca, "name", None) or ca.get("name", None)
+                name = _attr(payload, "name")
                 if not name:
-                    aid = getattr(ca, "agent_id", None) or ca.get("agent_id", "?")
+                    aid = _attr(payload, "agent_id") or "?"
                     name = agent_names.get(aid, aid)
                 return name
             elif tc_type == "azure_ai_search":
                 return "AzureAISearch"
             elif tc_type == "function":
-                fn = tc.function if hasattr(tc, "function") else tc.get("function", {})
-                name = getattr(fn, "name", None) or fn.get("name", "function")
-                return name
+                return _attr(payload, "name") or "function"
             return tc_type
 
-        _THINKING_RE = re.compile(
-            r'\[ORCHESTRATOR_THINKING\](.*?)\[/ORCHESTRATOR_THINKING\]',
-            flags=re.DOTALL,
-        )
-
-        def _extract_arguments(self, tc) -> tuple[str, str]:
-            """Parse and extract arguments from a tool call.
+        def _extract_arguments(self, tc_type: str, payload) -> tuple[str, str]:
+            """Parse and extract arguments from a tool call's payload.
 
             Returns (query, reasoning) tuple.
             """
-            tc_t = tc.type if hasattr(tc, "type") else tc.get("type", "?")
-            tc_type = tc_t.value if hasattr(tc_t, "value") else str(tc_t)
-            if tc_type == "function":
-                fn = tc.function if hasattr(tc, "function") else tc.get("function", {})
-                args_raw = getattr(fn, "arguments", None) or fn.get("arguments", "")
-                try:
-                    obj = json.loads(args_raw) if isinstance(args_raw, str) else args_raw
-                    raw = json.dumps(obj, indent=2) if isinstance(obj, dict) else str(obj)
-                except Exception:
-                    raw = str(args_raw)
-                reasoning = ""
-                query = raw
-                match = self._THINKING_RE.search(raw)
-                if match:
-                    reasoning = match.group(1).strip()
-                    if len(reasoning) > 500:
-                        reasoning = reasoning[:500] + "…"
-                    query = raw[:match.start()] + raw[match.end():]
-                    query = query.strip()
-                return query, reasoning
-            if tc_type != "connected_agent":
+            format_args = _ARGS_FORMATTERS.get(tc_type)
+            if format_args is None:
                 return "", ""
-            ca = tc.connected_agent if hasattr(tc, "connected_agent") else tc.get("connected_agent", {})
-            args_raw = getattr(ca, "arguments", None) or ca.get("arguments", None)
+            args_raw = _attr(payload, "arguments")
             if not args_raw:
                 return "", ""
-            try:
-                obj = json.loads(args_raw) if isinstance(args_raw, str) else args_raw
-                if isinstance(obj, str):
-                    raw = obj
-                elif isinstance(obj, dict):
-                    raw = None
-                    for key in ("query", "input"):
-                        if key in obj and len(obj) == 1:
-                            raw = str(obj[key])
-                            break
-                    if raw is None:
-                        raw = json.dumps(obj)
-                else:
-                    raw = json.dumps(obj)
-            except Exception:
-                raw = str(args_raw)
-
-            reasoning = ""
-            query = raw
-            match = self._THINKING_RE.search(raw)
-            if match:
-                reasoning = match.group(1).strip()
-                if len(reasoning) > 500:
-                    reasoning = reasoning[:500] + "…"
-                query = raw[:match.start()] + raw[match.end():]
-                query = query.strip()
-
-            return query, reasoning
+            return _split_thinking(format_args(args_raw))
 
         def _parse_structured_output(self, agent_name: str, raw_output: str) -> tuple:
             """Parse sub-agent output into (summary, visualizations, sub_steps).
@@ -255,25 +447,11 @@ async def run_orchestrator_session(
             if not raw_output:
                 return "", [], []
 
-            query_blocks = re.findall(
-                r'---QUERY---\s*(.+?)\s*---RESULTS---\s*(.+?)\s*(?=---QUERY---|---ANALYSIS---|$)',
-                raw_output, re.DOTALL,
-            )
-            analysis_match = re.search(
-                r'---ANALYSIS---\s*(.+)',
-                raw_output, re.DOTALL,
-            )
-            citations_match = re.search(
-                r'---CITATIONS---\s*(.+?)\s*---ANALYSIS---',
-                raw_output, re.DOTALL,
-            )
+            query_blocks, analysis, citations = _scan_sections(raw_output)
 
-            viz_type = {
-                "GraphExplorerAgent": "graph",
-                "TelemetryAgent": "table",
-            }.get(agent_name, "documents")
+            viz_type = _VIZ_TYPES.get(agent_name, "documents")
 
-            summary = analysis_match.group(1).strip() if analysis_match else raw_output
+            summary = analysis if analysis is not None else raw_output
 
             if query_blocks:
                 visualizations = []
@@ -281,10 +459,10 @@ async def run_orchestrator_session(
                 for idx, (query_text, results_text) in enumerate(query_blocks):
                     results_json = None
                     try:
-                        results_json = json.loads(results_text.strip())
+                        results_json = orjson.loads(results_text)
                     except (json.JSONDecodeError, ValueError):
                         try:
-                            results_json = ast.literal_eval(results_text.strip())
+                            results_json = ast.literal_eval(results_text)
                         except (ValueError, SyntaxError):
                             logger.warning(
                                 "Failed to parse structured results for %s", agent_name,
@@ -296,16 +474,16 @@ async def run_orchestrator_session(
                         results_json.pop("error", None)
                         visualizations.append({
                             "type": viz_type,
-                            "data": {**results_json, "query": query_text.strip()},
+                            "data": {**results_json, "query": query_text},
                         })
                         row_count = len(results_json.get("data", results_json.get("rows", [])))
                         result_summary = f"{row_count} results"
                     else:
-                        result_summary = results_text.strip()[:200]
+                        result_summary = results_text[:200]
 
                     sub_steps.append({
                         "index": idx,
-                        "query": query_text.strip(),
+                        "query": query_text,
                         "result_summary": result_summary,
                         "agent": agent_name,
                     })
@@ -318,9 +496,7 @@ async def run_orchestrator_session(
                     "data": {"content": summary, "agent": agent_name},
                 }], sub_steps
 
-            if citations_match and analysis_match:
-                citations = citations_match.group(1).strip()
-                summary = analysis_match.group(1).strip()
+            if citations is not None and analysis is not None:
                 return summary, [{
                     "type": "documents",
                     "data": {
@@ -330,9 +506,7 @@ async def run_orchestrator_session(
                     },
                 }], []
 
-            if agent_name in (
-                "RunbookKBAgent", "HistoricalTicketAgent", "AzureAISearch",
-            ):
+            if agent_name in _KB_AGENTS:
                 return raw_output, [{
                     "type": "documents",
                     "data": {"content": raw_output, "agent": agent_name},
@@ -350,11 +524,10 @@ async def run_orchestrator_session(
 
         # -- Step lifecycle --------------------------------------------------
 
-        def on_run_step(self, step):
-            s = step.status
-            status = s.value if hasattr(s, "value") else str(s)
-            t = step.type
-            step_type = t.value if hasattr(t, "value") else str(t)
+        async def on_run_step(self, step):
+            self.flush_deltas()
+            status = _enum_str(step.status)
+            step_type = _enum_str(step.type)
             logger.info("on_run_step: id=%s status=%s type=%s", step.id, status, step_type)
 
             if status == "in_progress" and step.id not in self.step_starts:
@@ -363,27 +536,30 @@ async def run_orchestrator_session(
                 if step_type == "tool_calls" and hasattr(step, "step_details"):
                     tool_calls = getattr(step.step_details, "tool_calls", None)
                     if tool_calls:
+                        started_at = _now_iso()  # shared by every call in the step
                         for tc in tool_calls:
                             self.ui_step += 1
                             tc_id = getattr(tc, "id", None) or str(id(tc))
-                            tool_call_id = str(uuid.uuid4())
-                            agent_name = self._resolve_agent_name(tc)
-                            query, reasoning = self._extract_arguments(tc)
+                            tool_call_id = _new_id()
+                            tc_type, payload = _tool_call_parts(tc)
+                            agent_name = self._resolve_agent_name(tc_type, payload)
+                            query, reasoning = self._extract_arguments(tc_type, payload)
+                            query = _clip(query, 500)
                             if step.id not in self._pending_steps:
                                 self._pending_steps[step.id] = {}
                             self._pending_steps[step.id][tc_id] = {
                                 "ui_step": self.ui_step,
                                 "tool_call_id": tool_call_id,
                                 "agent": agent_name,
-                                "query": query[:500] if query else "",
+                                "query": query,
                                 "reasoning": reasoning,
                             }
                             event = {
                                 "id": tool_call_id,
                                 "step": self.ui_step,
                                 "agent": agent_name,
-                                "query": query[:500] if query else "",
-                                "timestamp": datetime.now(timezone.utc).isoformat(),
+                                "query": query,
+                                "timestamp": started_at,
                             }
                             if reasoning:
                                 event["reasoning"] = reasoning
@@ -400,19 +576,21 @@ async def run_orchestrator_session(
                 err_code = ""
                 err_msg = "(no error detail)"
                 if last_err:
-                    err_code = getattr(last_err, "code", None) or (last_err.get("code") if isinstance(last_err, dict) else "") or ""
-                    err_msg = getattr(last_err, "message", None) or (last_err.get("message") if isinstance(last_err, dict) else str(last_err)) or ""
+                    err_code = _attr(last_err, "code") or ""
+                    err_msg = _attr(last_err, "message") or str(last_err)
 
                 failed_agent = "unknown"
                 failed_query = ""
                 if hasattr(step, "step_details") and hasattr(step.step_details, "tool_calls"):
                     for tc in step.step_details.tool_calls:
-                        failed_agent = self._resolve_agent_name(tc)
-                        failed_query, _ = self._extract_arguments(tc)
+                        tc_type, payload = _tool_call_parts(tc)
+                        failed_agent = self._resolve_agent_name(tc_type, payload)
+                        failed_query, _ = self._extract_arguments(tc_type, payload)
+                failed_query = _clip(failed_query, 500)
 
                 logger.error(
                     "Step FAILED: agent=%s  duration=%s  code=%s  error=%s\n  query=%s",
-                    failed_agent, duration, err_code, err_msg, failed_query[:500] if failed_query else "(none)",
+                    failed_agent, duration, err_code, err_msg, failed_query or "(none)",
                 )
 
                 pending = self._pending_steps.pop(step.id, None)
@@ -423,17 +601,17 @@ async def run_orchestrator_session(
                 else:
                     self.ui_step += 1
                     ui_step = self.ui_step
-                    tool_call_id = str(uuid.uuid4())
+                    tool_call_id = _new_id()
 
                 _put("tool_call.complete", {
                     "id": tool_call_id,
                     "step": ui_step,
                     "agent": failed_agent,
                     "duration": duration,
-                    "query": failed_query[:500] if failed_query else "",
+                    "query": failed_query,
                     "response": f"FAILED: [{err_code}] {err_msg}",
                     "error": True,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "timestamp": _now_iso(),
                 })
 
             elif status == "completed" and step_type == "tool_calls":
@@ -444,6 +622,7 @@ async def run_orchestrator_session(
                 if not hasattr(step.step_details, "tool_calls"):
                     return
 
+                completed_at = _now_iso()  # shared by every call in the step
                 for tc in step.step_details.tool_calls:
                     tc_id = getattr(tc, "id", None) or str(id(tc))
 
@@ -453,39 +632,39 @@ async def run_orchestrator_session(
                     else:
                         self.ui_step += 1
                         ui_step = self.ui_step
-                        tool_call_id = str(uuid.uuid4())
+                        tool_call_id = _new_id()
 
-                    agent_name = self._resolve_agent_name(tc)
-                    query, reasoning = self._extract_arguments(tc)
+                    tc_type, payload = _tool_call_parts(tc)
+                    agent_name = self._resolve_agent_name(tc_type, payload)
+                    query, reasoning = self._extract_arguments(tc_type, payload)
+                    query = _clip(query, 500)
                     response = ""
                     visualizations = []
                     sub_steps = []
 
-                    tc_t = tc.type if hasattr(tc, "type") else tc.get("type", "?")
-                    tc_type = tc_t.value if hasattr(tc_t, "value") else str(tc_t)
-
                     # ── Handle function tool calls (actions) ──
                     if tc_type == "function":
-                        fn = tc.function if hasattr(tc, "function") else tc.get("function", {})
-                        fn_name = getattr(fn, "name", None) or fn.get("name", "function")
-                        fn_output = self._last_fn_output.get(fn_name, "")
+                        fn_output = self._last_fn_output.get(agent_name, "")  # agent_name is the function name
 
                         action_data = {}
-                        try:
-                            action_data = json.loads(fn_output) if isinstance(fn_output, str) and fn_output else {}
-                        except (json.JSONDecodeError, TypeError):
-                            action_data = {"raw_output": str(fn_output)}
+                        if isinstance(fn_output, dict):
+                            action_data = fn_output
+                        else:
+                            try:
+                                action_data = orjson.loads(fn_output) if isinstance(fn_output, str) and fn_output else {}
+                            except (json.JSONDecodeError, TypeError):
+                                action_data = {"raw_output": str(fn_output)}
 
                         event_data = {
                             "id": tool_call_id,
                             "step": ui_step,
                             "agent": agent_name,
                             "duration": duration,
-                            "query": query[:500] if query else "",
+                            "query": query,
                             "response": f"Action executed: {agent_name}",
                             "action": action_data,
                             "is_action": True,
-                            "timestamp": datetime.now(timezone.utc).isoformat(),
+                            "timestamp": completed_at,
                         }
                         if reasoning:
                             event_data["reasoning"] = reasoning
@@ -494,29 +673,24 @@ async def run_orchestrator_session(
 
                     # ── Handle connected_agent and other tool calls ──
                     if tc_type == "connected_agent":
-                        ca = (
-                            tc.connected_agent
-                            if hasattr(tc, "connected_agent")
-                            else tc.get("connected_agent", {})
-                        )
-                        out = getattr(ca, "output", None) or ca.get("output", None)
+                        out = _attr(payload, "output")
+                        if out is not None and not isinstance(out, str):
+                            out = str(out)
                         if out:
                             response, visualizations, sub_steps = self._parse_structured_output(
-                                agent_name, str(out),
+                                agent_name, out,
                             )
                             if not response:
-                                response = str(out)
+                                response = out
 
-                    if len(query) > 500:
-                        query = query[:500] + "…"
-                    if len(response) > 2000:
-                        response = response[:2000] + "…"
+                    response = _clip(response, 2000)
 
                     logger.info("Emitting tool_call.complete step %d: agent=%s duration=%s", ui_step, agent_name, duration)
+                    # %.Ns truncates at format time, only if the record is emitted
                     if query:
-                        logger.info("  ↳ query: %s", query[:300])
+                        logger.info("  ↳ query: %.300s", query)
                     if response:
-                        logger.info("  ↳ response (%d chars): %s", len(response), response[:200])
+                        logger.info("  ↳ response (%d chars): %.200s", len(response), response)
 
                     event_data = {
                         "id": tool_call_id,
@@ -525,7 +699,7 @@ async def run_orchestrator_session(
                         "duration": duration,
                         "query": query,
                         "response": response,
-                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "timestamp": completed_at,
                     }
                     if visualizations:
                         event_data["visualizations"] = visualizations
@@ -537,235 +711,229 @@ async def run_orchestrator_session(
 
         # -- Streaming message text ------------------------------------------
 
-        def on_message_delta(self, delta):
-            if delta.text:
-                text_chunk = delta.text.value
-                self.response_text += text_chunk
+        async def on_message_delta(self, delta):
+            text_chunk = delta.text  # joined text of the chunk's content parts
+            if text_chunk:
+                self._response_parts.append(text_chunk)
 
                 # Emit message.start on the first chunk
                 if not self._message_started:
-                    self._message_id = str(uuid.uuid4())
+                    self._message_id = _new_id()
+                    self._delta_prefix = '{"id":' + orjson.dumps(self._message_id).decode() + ',"text":'
                     self._message_started = True
                     _put("message.start", {"id": self._message_id})
 
-                _put("message.delta", {
-                    "id": self._message_id,
-                    "text": text_chunk,
+                # Coalesce token-sized chunks into fewer message.delta events
+                self._delta_buf.append(text_chunk)
+                self._delta_chars += len(text_chunk)
+                if (
+                    self._delta_chars >= _DELTA_FLUSH_CHARS
+                    or time.monotonic() - self._last_delta_flush >= _DELTA_FLUSH_INTERVAL
+                ):
+                    self.flush_deltas()
+
+        def flush_deltas(self):
+            """Emit buffered message text as a single message.delta event."""
+            if self._delta_buf:
+                # Highest-frequency event: splice the encoded text onto the
+                # pre-encoded envelope rather than building and dumping a dict
+                pending.append({
+                    "event": "message.delta",
+                    "data": self._delta_prefix + orjson.dumps("".join(self._delta_buf)).decode() + "}",
                 })
+                self._delta_buf.clear()
+                self._delta_chars = 0
+            self._last_delta_flush = time.monotonic()
 
-        def on_error(self, data):
+        async def on_error(self, data):
+            self.flush_deltas()
             _put("error", {"message": str(data)})
 
-    # -- Thread target -------------------------------------------------------
+    # -- Run loop --------------------------------------------------------------
 
     MAX_RUN_ATTEMPTS = 2
 
-    def _is_capacity_error(error_text: str) -> bool:
-        """Check if an error message indicates Fabric capacity exhaustion."""
-        capacity_markers = [
-            "429", "capacity", "circuit breaker", "throttl",
-            "Fabric capacity", "too many requests", "503",
-        ]
-        lower = error_text.lower()
-        return any(m.lower() in lower for m in capacity_markers)
-
-    def _run_in_thread():
-        overall_t0 = time.monotonic()
-        total_steps = 0
-        total_tokens = 0
-        error_emitted = False
-
-        try:
-            # Check cancellation before starting
+    overall_t0 = time.monotonic()
+    total_steps = 0
+    total_tokens = 0
+    error_emitted = False
+
+    try:
+        # Check cancellation before starting
+        if cancel_event and cancel_event.is_set():
+            _put("status", {"message": "Cancelling..."})
+            _put("error", {"message": "Investigation cancelled by user."})
+            while pending:
+                yield pending.popleft()
+            return
+
+        _put("run.start", {
+            "run_id": "",
+            "alert": alert_text,
+            "timestamp": _now_iso(),
+        })
+
+        agents_client = _get_project_client().agents
+        fn_outputs: dict[str, dict | str] = {}
+        _fn_output_cache.set(fn_outputs)
+
+        # Thread reuse for multi-turn follow-ups
+        if existing_thread_id:
+            thread_id = existing_thread_id
+        else:
+            thread = await agents_client.threads.create()
+            thread_id = thread.id
+
+        # Emit session.created so SessionManager can track the thread
+        _put("session.created", {"session_id": "", "thread_id": thread_id})
+        while pending:
+            yield pending.popleft()
+
+        await agents_client.messages.create(
+            thread_id=thread_id,
+            role="user",
+            content=alert_text,
+        )
+
+        last_error_detail = ""
+        for attempt in range(1, MAX_RUN_ATTEMPTS + 1):
+            # Check cancellation between retry attempts
             if cancel_event and cancel_event.is_set():
                 _put("status", {"message": "Cancelling..."})
                 _put("error", {"message": "Investigation cancelled by user."})
-                return
-
-            _put("run.start", {
-                "run_id": "",
-                "alert": alert_text,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            })
-
-            client = _get_project_client()
-            with client:
-                agents_client = client.agents
-
-                # Set up FunctionTool auto-execution for dispatch actions
-                from azure.ai.agents.models import FunctionTool as _FnTool, ToolSet
-                from app.dispatch import dispatch_field_engineer
-
-                _fn_output_cache: dict[str, str] = {}
-
-                def _wrapped_dispatch(**kwargs):
-                    result = dispatch_field_engineer(**kwargs)
-                    _fn_output_cache["dispatch_field_engineer"] = result
-                    return result
-
-                _wrapped_dispatch.__name__ = "dispatch_field_engineer"
-                _wrapped_dispatch.__doc__ = dispatch_field_engineer.__doc__
-
-                _dispatch_fn = _FnTool(functions=[_wrapped_dispatch])
-                _toolset = ToolSet()
-                _toolset.add(_dispatch_fn)
-                agents_client.enable_auto_function_calls(_toolset)
-
-                # Thread reuse for multi-turn follow-ups
-                if existing_thread_id:
-                    thread_id = existing_thread_id
-                else:
-                    thread = agents_client.threads.create()
-                    thread_id = thread.id
-
-                # Emit session.created so SessionManager can track the thread
-                _put("session.created", {"session_id": "", "thread_id": thread_id})
-
-                agents_client.messages.create(
+                error_emitted = True
+                break
+
+            handler = SSEEventHandler()
+            handler._last_fn_output = fn_outputs
+
+            if attempt > 1:
+                recovery_msg = (
+                    f"[SYSTEM] The previous investigation attempt failed with: "
+                    f"{last_error_detail}\n\n"
+                    f"Please retry the investigation. If a sub-agent tool call "
+                    f"failed, try a different or simpler query, or skip that "
+                    f"data source and continue with the information you have."
+                )
+                await agents_client.messages.create(
                     thread_id=thread_id,
                     role="user",
-                    content=alert_text,
+                    content=recovery_msg,
+                )
+                _put("status", {
+                    "message": f"Retrying investigation (attempt {attempt}/{MAX_RUN_ATTEMPTS})...",
+                })
+                logger.info(
+                    "Orchestrator retry attempt %d/%d after error: %s",
+                    attempt, MAX_RUN_ATTEMPTS, last_error_detail[:300],
                 )
 
-                last_error_detail = ""
-                for attempt in range(1, MAX_RUN_ATTEMPTS + 1):
-                    # Check cancellation between retry attempts
-                    if cancel_event and cancel_event.is_set():
-                        _put("status", {"message": "Cancelling..."})
-                        _put("error", {"message": "Investigation cancelled by user."})
-                        error_emitted = True
-                        break
-
-                    handler = SSEEventHandler()
-                    handler._last_fn_output = _fn_output_cache
-
-                    if attempt > 1:
-                        recovery_msg = (
-                            f"[SYSTEM] The previous investigation attempt failed with: "
-                            f"{last_error_detail}\n\n"
-                            f"Please retry the investigation. If a sub-agent tool call "
-                            f"failed, try a different or simpler query, or skip that "
-                            f"data source and continue with the information you have."
-                        )
-                        agents_client.messages.create(
-                            thread_id=thread_id,
-                            role="user",
-                            content=recovery_msg,
-                        )
-                        _put("status", {
-                            "message": f"Retrying investigation (attempt {attempt}/{MAX_RUN_ATTEMPTS})...",
-                        })
-                        logger.info(
-                            "Orchestrator retry attempt %d/%d after error: %s",
-                            attempt, MAX_RUN_ATTEMPTS, last_error_detail[:300],
-                        )
-
-                    with agents_client.runs.stream(
-                        thread_id=thread_id,
-                        agent_id=orchestrator_id,
-                        event_handler=handler,
-                    ) as stream:
-                        stream.until_done()
-
-                    total_steps += handler.ui_step
-                    total_tokens += handler.total_tokens
-
-                    if handler.run_failed:
-                        last_error_detail = handler.run_error_detail
-                        if _is_capacity_error(last_error_detail):
-                            logger.warning(
-                                "Skipping orchestrator retry — Fabric capacity error: %s",
-                                last_error_detail[:200],
-                            )
-                            error_emitted = True
-                            _put("error", {
-                                "message": (
-                                    f"Investigation stopped — Fabric capacity exhausted. "
-                                    f"{total_steps} steps completed.\n\n"
-                                    f"{last_error_detail}"
-                                ),
-                            })
-                            break
-                        if attempt < MAX_RUN_ATTEMPTS:
-                            logger.warning(
-                                "Orchestrator run failed, will retry (attempt %d/%d): %s",
-                                attempt, MAX_RUN_ATTEMPTS, last_error_detail[:300],
-                            )
-                            continue
-                        else:
-                            error_emitted = True
-                            _put("error", {
-                                "message": (
-                                    f"Agent run interrupted — A backend query returned an error. "
-                                    f"{total_steps} steps completed before the error. "
-                                    f"Retried {MAX_RUN_ATTEMPTS} times.\n\n"
-                                    f"Error detail: {last_error_detail}"
-                                ),
-                            })
-                            break
-
-                    if handler.response_text:
-                        clean = SSEEventHandler._THINKING_RE.sub('', handler.response_text).strip()
-                        # Emit message.complete with the full text
-                        msg_id = handler._message_id or str(uuid.uuid4())
-                        _put("message.complete", {"id": msg_id, "text": clean})
-                        break
-                    else:
-                        # Fetch from thread — streaming may not have captured text
-                        messages = agents_client.messages.list(thread_id=thread_id)
-                        text = ""
-                        for msg in messages:
-                            if msg.role == "assistant":
-                                text = ""
-                                for block in msg.content:
-                                    if hasattr(block, "text"):
-                                        text += block.text.value + "\n"
-                                break  # first item is the most recent
-                        if text:
-                            clean = SSEEventHandler._THINKING_RE.sub('', text).strip()
-                            msg_id = handler._message_id or str(uuid.uuid4())
-                            _put("message.complete", {"id": msg_id, "text": clean})
-                            break
-
-                        last_error_detail = (
-                            f"Run produced no response after {handler.ui_step} steps."
+            async with await agents_client.runs.stream(
+                thread_id=thread_id,
+                agent_id=orchestrator_id,
+                event_handler=handler,
+            ) as stream:
+                # Each step dispatches one stream event to the handler
+                # callbacks; forward what they buffered straight away
+                async for _ in stream:
+                    while pending:
+                        yield pending.popleft()
+            handler.flush_deltas()
+
+            total_steps += handler.ui_step
+            total_tokens += handler.total_tokens
+
+            if handler.run_failed:
+                last_error_detail = handler.run_error_detail
+                if _is_capacity_error(last_error_detail):
+                    logger.warning(
+                        "Skipping orchestrator retry — Fabric capacity error: %s",
+                        last_error_detail[:200],
+                    )
+                    error_emitted = True
+                    _put("error", {
+                        "message": (
+                            f"Investigation stopped — Fabric capacity exhausted. "
+                            f"{total_steps} steps completed.\n\n"
+                            f"{last_error_detail}"
+                        ),
+                    })
+                    break
+                if attempt < MAX_RUN_ATTEMPTS:
+                    logger.warning(
+                        "Orchestrator run failed, will retry (attempt %d/%d): %s",
+                        attempt, MAX_RUN_ATTEMPTS, last_error_detail[:300],
+                    )
+                    continue
+                else:
+                    error_emitted = True
+                    _put("error", {
+                        "message": (
+                            f"Agent run interrupted — A backend query returned an error. "
+                            f"{total_steps} steps completed before the error. "
+                            f"Retried {MAX_RUN_ATTEMPTS} times.\n\n"
+                            f"Error detail: {last_error_detail}"
+                        ),
+                    })
+                    break
+
+            if handler._response_parts:
+                clean = await _strip_thinking_async(handler.response_text)
+                # Emit message.complete with the full text
+                msg_id = handler._message_id or _new_id()
+                _put("message.complete", {"id": msg_id, "text": clean})
+                break
+            else:
+                # Fetch from thread — streaming may not have captured text.
+                # Only this run's messages, newest first, one per page: the
+                # reply is normally the first item, so one small request.
+                messages = agents_client.messages.list(
+                    thread_id=thread_id, run_id=handler.run_id, order="desc", limit=1,
+                )
+                text = ""
+                async for msg in messages:
+                    if msg.role == "assistant":
+                        text = "".join(
+                            block.text.value + "\n"
+                            for block in msg.content
+                            if hasattr(block, "text")
                         )
-                        if attempt < MAX_RUN_ATTEMPTS:
-                            logger.warning(
-                                "Orchestrator run produced no response, will retry (attempt %d/%d)",
-                                attempt, MAX_RUN_ATTEMPTS,
-                            )
-                            continue
-                        else:
-                            error_emitted = True
-                            _put("error", {
-                                "message": (
-                                    f"Investigation did not produce a final response "
-                                    f"after {MAX_RUN_ATTEMPTS} attempts. "
-                                    f"{total_steps} steps were completed."
-                                ),
-                            })
-
-                if not error_emitted:
-                    overall_elapsed = f"{time.monotonic() - overall_t0:.1f}s"
-                    _put("run.complete", {
-                        "steps": total_steps,
-                        "time": overall_elapsed,
+                        break  # first item is the most recent
+                if text:
+                    clean = await _strip_thinking_async(text)
+                    msg_id = handler._message_id or _new_id()
+                    _put("message.complete", {"id": msg_id, "text": clean})
+                    break
+
+                last_error_detail = (
+                    f"Run produced no response after {handler.ui_step} steps."
+                )
+                if attempt < MAX_RUN_ATTEMPTS:
+                    logger.warning(
+                        "Orchestrator run produced no response, will retry (attempt %d/%d)",
+                        attempt, MAX_RUN_ATTEMPTS,
+                    )
+                    continue
+                else:
+                    error_emitted = True
+                    _put("error", {
+                        "message": (
+                            f"Investigation did not produce a final response "
+                            f"after {MAX_RUN_ATTEMPTS} attempts. "
+                            f"{total_steps} steps were completed."
+                        ),
                     })
 
-        except Exception as e:
-            logger.exception("Orchestrator session run failed")
-            _put("error", {"message": str(e)})
-        finally:
-            asyncio.run_coroutine_threadsafe(queue.put(None), loop)
-
-    # -- Launch and yield (no EVENT_TIMEOUT — session manager owns lifecycle) --
+        if not error_emitted:
+            overall_elapsed = f"{time.monotonic() - overall_t0:.1f}s"
+            _put("run.complete", {
+                "steps": total_steps,
+                "time": overall_elapsed,
+            })
 
-    t = threading.Thread(target=_run_in_thread, daemon=True)
-    t.start()
+    except Exception as e:
+        logger.exception("Orchestrator session run failed")
+        _put("error", {"message": str(e)})
 
-    while True:
-        item = await queue.get()
-        if item is None:
-            break
-        yield item
+    while pending:
+        yield pending.popleft()
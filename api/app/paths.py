@@ -7,6 +7,7 @@ All files that need PROJECT_ROOT or CONFIG_FILE should import from here.
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -20,3 +21,43 @@ CONFIG_FILE = PROJECT_ROOT / "azure_config.env"
 
 # Load config once at import time (before reading env vars that may be in the file)
 load_dotenv(CONFIG_FILE)
+
+
+# ---------------------------------------------------------------------------
+# Service settings
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Service endpoints and names, read from the environment once."""
+
+    project_endpoint: str
+    ai_foundry_project_name: str
+    ai_foundry_name: str
+    azure_search_endpoint: str
+    azure_search_key: str
+    ai_search_name: str
+    cosmos_endpoint: str
+    graph_query_api_uri: str
+    model_deployment_name: str
+    embedding_model: str
+
+    @classmethod
+    def from_env(cls) -> Settings:
+        return cls(
+            project_endpoint=os.getenv("PROJECT_ENDPOINT", ""),
+            ai_foundry_project_name=os.getenv("AI_FOUNDRY_PROJECT_NAME", ""),
+            ai_foundry_name=os.getenv("AI_FOUNDRY_NAME", ""),
+            azure_search_endpoint=(
+                os.getenv("AZURE_SEARCH_ENDPOINT", "") or os.getenv("AI_SEARCH_ENDPOINT", "")
+            ),
+            azure_search_key=os.getenv("AZURE_SEARCH_KEY", ""),
+            ai_search_name=os.getenv("AI_SEARCH_NAME", ""),
+            cosmos_endpoint=os.getenv("COSMOS_NOSQL_ENDPOINT", ""),
+            graph_query_api_uri=os.getenv("GRAPH_QUERY_API_URI", "http://localhost:8100"),
+            model_deployment_name=os.getenv("MODEL_DEPLOYMENT_NAME", ""),
+            embedding_model=os.getenv("EMBEDDING_MODEL", ""),
+        )
+
+
+settings = Settings.from_env()
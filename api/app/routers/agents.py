@@ -7,7 +7,7 @@ Discovered from AI Foundry at runtime (cached with TTL).
 
 from fastapi import APIRouter
 
-from app.agent_ids import get_agent_list, invalidate_cache, load_agent_ids
+from app.agent_ids import get_agent_list, invalidate_cache, load_agent_ids_async
 
 router = APIRouter(prefix="/api", tags=["agents"])
 
@@ -15,7 +15,8 @@ router = APIRouter(prefix="/api", tags=["agents"])
 @router.get("/agents")
 async def list_agents():
     """List provisioned agents discovered from AI Foundry."""
-    agents = get_agent_list()
+    data = await load_agent_ids_async()  # refresh off the event loop on cache miss
+    agents = get_agent_list(data)
     if agents:
         return {"agents": agents, "source": "foundry-discovery"}
     return {"agents": [], "source": "none"}
@@ -25,8 +26,8 @@ async def list_agents():
 async def rediscover_agents():
     """Invalidate agent cache and re-discover from AI Foundry."""
     invalidate_cache()
-    data = load_agent_ids()  # triggers re-discovery
-    agents = get_agent_list()
+    data = await load_agent_ids_async()  # triggers re-discovery
+    agents = get_agent_list(data)
     return {
         "ok": bool(data),
         "agents": agents,
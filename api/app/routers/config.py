@@ -19,7 +19,12 @@ import yaml
 from fastapi import APIRouter, HTTPException
 
 from app.paths import PROJECT_ROOT
-from app.agent_ids import load_agent_ids
+from app.agent_ids import load_agent_ids_async
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional — stdlib json accepts bytes too
+    _json_loads = json.loads
 
 logger = logging.getLogger("app.config")
 
@@ -127,7 +132,7 @@ SCENARIO_CONFIG = _build_scenario_config(_manifest) if _manifest else {"agents":
 # ---------------------------------------------------------------------------
 
 
-def _load_current_config() -> dict:
+async def _load_current_config() -> dict:
     """Load current config from Foundry agent discovery + env-var defaults."""
     _runbooks_default = (
         _manifest.get("data_sources", {}).get("search_indexes", {}).get("runbooks", {}).get("index_name", "runbooks-index")
@@ -145,7 +150,7 @@ def _load_current_config() -> dict:
     }
 
     try:
-        data = load_agent_ids()
+        data = await load_agent_ids_async()
         if data:
             config["agents"] = data
     except Exception:
@@ -162,7 +167,7 @@ def _load_current_config() -> dict:
 @router.get("/current", summary="Get current configuration")
 async def get_current_config():
     """Return the current active data source bindings and agent IDs."""
-    return _load_current_config()
+    return await _load_current_config()
 
 
 # ---------------------------------------------------------------------------
@@ -306,6 +311,45 @@ async def get_resource_graph():
     return _build_resource_graph(SCENARIO_CONFIG, SCENARIO_NAME)
 
 
+_ARCHITECTURE_CANDIDATES = [
+    Path("/app/data/architecture_graph.json"),
+    PROJECT_ROOT / "data" / "architecture_graph.json",
+]
+
+# Parsed architecture graph, reused until the file's mtime changes
+_arch_cache: dict | None = None
+_arch_cache_key: tuple[str, float] | None = None
+
+
+def _read_architecture_graph() -> dict | None:
+    """Return the parsed architecture graph, or None if no candidate exists.
+
+    Opens the file once and fstat()s the descriptor, so a cache hit costs a
+    single open/fstat pair instead of exists() + stat() + read_text().
+    """
+    global _arch_cache, _arch_cache_key
+    for p in _ARCHITECTURE_CANDIDATES:
+        try:
+            fd = os.open(p, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            st = os.fstat(fd)
+            key = (str(p), st.st_mtime)
+            if _arch_cache is not None and key == _arch_cache_key:
+                return _arch_cache
+            raw = os.read(fd, st.st_size)
+        finally:
+            os.close(fd)
+        try:
+            data = _json_loads(raw)
+        except json.JSONDecodeError as e:  # orjson's error subclasses this
+            raise HTTPException(500, f"Invalid JSON in {p}: {e}")
+        _arch_cache, _arch_cache_key = data, key
+        return data
+    return None
+
+
 @router.get("/architecture", summary="Get static architecture graph")
 async def get_architecture():
     """Return the hand-curated architecture graph from data/architecture_graph.json.
@@ -314,17 +358,10 @@ async def get_architecture():
     tools, data sources, and infrastructure.  Regenerate the file when the
     architecture changes or new tools are added.
     """
-    candidates = [
-        Path("/app/data/architecture_graph.json"),
-        PROJECT_ROOT / "data" / "architecture_graph.json",
-    ]
-    for p in candidates:
-        if p.exists():
-            try:
-                return json.loads(p.read_text())
-            except json.JSONDecodeError as e:
-                raise HTTPException(500, f"Invalid JSON in {p}: {e}")
-    raise HTTPException(404, "architecture_graph.json not found")
+    data = _read_architecture_graph()
+    if data is None:
+        raise HTTPException(404, "architecture_graph.json not found")
+    return data
 
 
 @router.get("/scenario", summary="Active scenario metadata")
@@ -19,6 +19,7 @@ from collections import OrderedDict
 from typing import Optional
 
 import httpx
+import orjson
 
 from app.sessions import Session, SessionStatus
 from app.orchestrator import run_orchestrator_session
@@ -37,7 +38,7 @@ def _parse_data(event: dict) -> dict:
     raw = event.get("data", "{}")
     if isinstance(raw, str):
         try:
-            return json.loads(raw)
+            return orjson.loads(raw)
         except (json.JSONDecodeError, ValueError):
             logger.warning("Malformed JSON in event data: %s", raw[:200])
             return {}
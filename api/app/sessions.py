@@ -59,6 +59,8 @@ class Session:
         default_factory=threading.Event, repr=False
     )
     _idle_task: Optional[asyncio.Task] = field(default=None, repr=False)
+    # message.delta events shed for lagging subscribers (observability)
+    _dropped_deltas: int = field(default=0, repr=False)
 
     # Threading lock — protects _subscribers and event_log against
     # concurrent access from the orchestrator thread and asyncio loop.
@@ -70,12 +72,22 @@ class Session:
 
     MAX_EVENT_LOG_SIZE = 2000  # chunking at persistence layer handles Cosmos limits
 
+    # Per-subscriber backpressure: once a live queue is this full, streamed
+    # text deltas are dropped (message.complete carries the full text) so
+    # the remaining headroom is kept for lifecycle events.
+    SUBSCRIBER_QUEUE_SIZE = 500
+    LOSSY_HIGH_WATER = 400
+    LOSSY_EVENTS = frozenset({"message.delta"})
+
     def push_event(self, event: dict):
         """Append to log and fan out to all live SSE subscribers.
 
-        Thread-safe: called from the orchestrator's background thread.
-        Uses loop.call_soon_threadsafe() to safely enqueue to asyncio.Queues,
-        matching the pattern in LogBroadcaster.broadcast().
+        Thread-safe: when called off the event loop it uses
+        loop.call_soon_threadsafe() to enqueue to asyncio.Queues, matching
+        the pattern in LogBroadcaster.broadcast(). On the loop itself (the
+        orchestrator streams natively async) it enqueues directly, skipping
+        the self-pipe wakeup per event. See _offer() for how slow
+        subscribers are handled.
         """
         with self._lock:
             self.event_log.append(event)
@@ -86,22 +98,35 @@ class Session:
                 self.event_log = self.event_log[-self.MAX_EVENT_LOG_SIZE:]
             self.updated_at = datetime.now(timezone.utc).isoformat()
             snapshot = list(self._subscribers)
-        dead: list[asyncio.Queue] = []
+        if not snapshot:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:  # no loop in this thread
+            on_loop = False
         for q in snapshot:
+            if on_loop or self._loop is None or not self._loop.is_running():
+                self._offer(q, event)
+                continue
             try:
-                if self._loop is not None and self._loop.is_running():
-                    self._loop.call_soon_threadsafe(q.put_nowait, event)
-                else:
-                    q.put_nowait(event)
-            except (asyncio.QueueFull, RuntimeError):
-                dead.append(q)
-        if dead:
-            with self._lock:
-                for q in dead:
-                    try:
-                        self._subscribers.remove(q)
-                    except ValueError:
-                        pass
+                self._loop.call_soon_threadsafe(self._offer, q, event)
+            except RuntimeError:  # loop closed
+                self.unsubscribe(q)
+
+    def _offer(self, q: asyncio.Queue, event: dict):
+        """Enqueue one event for one subscriber, shedding deltas if it lags.
+
+        Runs on the event loop, so QueueFull is handled here rather than
+        surfacing as an unhandled callback error. A subscriber too far
+        behind to accept even lifecycle events is dropped.
+        """
+        if event.get("event") in self.LOSSY_EVENTS and q.qsize() >= self.LOSSY_HIGH_WATER:
+            self._dropped_deltas += 1
+            return
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            self.unsubscribe(q)
 
     def subscribe(self, since_index: int = 0) -> tuple[list[dict], asyncio.Queue]:
         """Return (existing_events, live_queue) for SSE replay + tail.
@@ -115,7 +140,7 @@ class Session:
         lock, so no event can fall between the snapshot and the queue.
         """
         loop = asyncio.get_running_loop()
-        q: asyncio.Queue = asyncio.Queue(maxsize=500)
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.SUBSCRIBER_QUEUE_SIZE)
         with self._lock:
             if self._loop is None:
                 self._loop = loop
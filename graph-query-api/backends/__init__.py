@@ -151,7 +151,7 @@ try:
 except ImportError:
     import logging
     logging.getLogger("graph-query-api").warning(
-        "FabricGQLBackend not available (missing httpx?)"
+        "FabricGQLBackend not available (missing aiohttp?)"
     )
 
 try:
@@ -12,9 +12,11 @@ import asyncio
 import logging
 import random
 import time
+from dataclasses import dataclass, field
 from typing import Callable
 
-import httpx
+import aiohttp
+import orjson
 from fastapi import HTTPException
 
 from config import get_credential
@@ -22,7 +24,7 @@ from adapters.fabric_config import (
     FABRIC_API_URL,
     FABRIC_SCOPE,
 )
-from backends.fabric_throttle import get_fabric_gate
+from backends.fabric_throttle import get_fabric_gate, get_fabric_http_client
 
 logger = logging.getLogger("graph-query-api.fabric")
 
@@ -31,24 +33,132 @@ _MAX_429_RETRIES = 2
 _MAX_COLDSTART_RETRIES = 5
 _MAX_CONTINUATION_RETRIES = 5
 _DEFAULT_429_WAIT = 30  # seconds
-_TOKEN_STALE_THRESHOLD = 3000  # seconds (~50 min) before re-acquiring
+_MIN_RETRY_WAIT = 1.0  # seconds — floor for jittered back-off
+_MAX_RESPONSE_BYTES = 50 * 1024 * 1024  # hard cap on a GQL result body
+_OFFLOAD_DECODE_BYTES = 1024 * 1024  # decode larger bodies off the event loop
 
 
-def _parse_retry_after(response: httpx.Response, default: int = 30) -> int:
+def _parse_retry_after(response: aiohttp.ClientResponse, default: int = 30) -> int:
     """Parse Retry-After header from a 429 response."""
-    raw = response.headers.get("Retry-After", "")
-    try:
-        val = int(raw)
-        return val if 0 < val <= 120 else default
-    except (ValueError, TypeError):
+    raw = response.headers.get("Retry-After", "").strip()
+    if not raw.isdecimal():  # missing, HTTP-date, or fractional
         return default
+    val = int(raw)
+    return val if 0 < val <= 120 else default
+
+
+_TOKEN_REFRESH_MARGIN = 300  # seconds before expiry to re-acquire
+
+
+@dataclass
+class _TokenCache:
+    """Process-wide Fabric access token, reused until near expiry."""
+
+    token: str = ""
+    expires_on: float = 0.0  # unix time, as reported by AccessToken
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def fresh(self) -> str | None:
+        if self.token and time.time() < self.expires_on - _TOKEN_REFRESH_MARGIN:
+            return self.token
+        return None
+
+
+_token_cache = _TokenCache()
+
+# fabric_discovery accessors, bound on first execute_query().  The module
+# raises at import time when the Fabric env vars are unset, so importing
+# it at the top would break backend registration.
+_get_fabric_config: Callable | None = None
+_is_fabric_ready: Callable[[], bool] | None = None
+
+
+async def _read_result_body(response: aiohttp.ClientResponse) -> dict:
+    """Read and decode a 200 GQL response, bounded by _MAX_RESPONSE_BYTES.
+
+    The body is streamed in chunks so an oversized result is rejected
+    without buffering it all; large bodies are decoded in a worker thread.
+    """
+    too_large = HTTPException(
+        status_code=502,
+        detail=f"Fabric GQL response exceeded {_MAX_RESPONSE_BYTES // (1024 * 1024)} MB.",
+    )
+    if (response.content_length or 0) > _MAX_RESPONSE_BYTES:
+        raise too_large
+    buf = bytearray()
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        buf += chunk
+        if len(buf) > _MAX_RESPONSE_BYTES:
+            raise too_large
+    if len(buf) > _OFFLOAD_DECODE_BYTES:
+        return await asyncio.to_thread(orjson.loads, buf)
+    return orjson.loads(buf)
 
 
 async def acquire_fabric_token() -> str:
-    """Acquire a Fabric API token via DefaultAzureCredential (standalone helper)."""
-    credential = get_credential()
-    token = await asyncio.to_thread(credential.get_token, FABRIC_SCOPE)
-    return token.token
+    """Return a Fabric API token, re-acquiring via DefaultAzureCredential
+    only when the cached one is within 5 minutes of expiry."""
+    token = _token_cache.fresh()
+    if token is not None:
+        return token
+    async with _token_cache.lock:
+        # Another caller may have refreshed while we waited for the lock
+        token = _token_cache.fresh()
+        if token is not None:
+            return token
+        credential = get_credential()
+        access = await asyncio.to_thread(credential.get_token, FABRIC_SCOPE)
+        _token_cache.token = access.token
+        _token_cache.expires_on = float(access.expires_on)
+        return access.token
+
+
+@dataclass(frozen=True)
+class _TopologyQuery:
+    """One topology relationship: its prebuilt GQL query plus the result
+    column keys, so row parsing never rebuilds key strings."""
+
+    rel: str
+    source: str
+    target: str
+    s_id: str
+    t_id: str
+    s_key: str  # result column holding the source id
+    t_key: str  # result column holding the target id
+    s_prop_keys: tuple[tuple[str, str], ...]  # (property, column) pairs
+    t_prop_keys: tuple[tuple[str, str], ...]
+    query: str
+
+    @classmethod
+    def from_schema(cls, r: dict) -> _TopologyQuery:
+        """Build the query for one schema entry.
+
+        Uses explicit property projections (s.*, t.* wildcards fail in
+        Fabric's managed identity context).
+        """
+        s_id = r["s_id"]
+        t_id = r["t_id"]
+        s_prop_keys = tuple((p, f"s_{p}") for p in r.get("s_props", []))
+        t_prop_keys = tuple((p, f"t_{p}") for p in r.get("t_props", []))
+        ret_cols = [f"s.`{s_id}` AS `s_{s_id}`"]
+        ret_cols += [f"s.`{p}` AS `{k}`" for p, k in s_prop_keys]
+        ret_cols.append(f"t.`{t_id}` AS `t_{t_id}`")
+        ret_cols += [f"t.`{p}` AS `{k}`" for p, k in t_prop_keys]
+        return cls(
+            rel=r["rel"],
+            source=r["source"],
+            target=r["target"],
+            s_id=s_id,
+            t_id=t_id,
+            s_key=f"s_{s_id}",
+            t_key=f"t_{t_id}",
+            s_prop_keys=s_prop_keys,
+            t_prop_keys=t_prop_keys,
+            query=(
+                f"MATCH (s:`{r['source']}`)-[e:`{r['rel']}`]->(t:`{r['target']}`) "
+                f"RETURN {', '.join(ret_cols)} LIMIT 500"
+            ),
+        )
 
 
 class FabricGQLBackend:
@@ -65,16 +175,13 @@ used by other backends so routers don't need changes.
 
     def __init__(self, graph_name: str = "__default__"):
         self._graph_name = graph_name
-        self._client: httpx.AsyncClient | None = None
 
     # ------------------------------------------------------------------
-    # HTTP client (lazy, reusable)
+    # HTTP client (process-wide, shared across backend instances)
     # ------------------------------------------------------------------
 
-    def _get_client(self) -> httpx.AsyncClient:
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=120.0)
-        return self._client
+    def _get_client(self) -> aiohttp.ClientSession:
+        return get_fabric_http_client()
 
     # ------------------------------------------------------------------
     # Token acquisition
@@ -101,20 +208,23 @@ used by other backends so routers don't need changes.
 
         We return the normalised: {"columns": [...], "data": [...]}
 
-        Concurrency is bounded by the shared FabricThrottleGate (semaphore +
-        circuit breaker). Retry strategy is differentiated by error type —
+        Concurrency is bounded by the shared FabricThrottleGate (capacity
+        limiter + circuit breaker). Retry strategy is differentiated by error type —
         see documentation/fabric_control.md Fix 2.
         """
-        from fabric_discovery import get_fabric_config, is_fabric_ready
+        global _get_fabric_config, _is_fabric_ready
+        if _is_fabric_ready is None:
+            from fabric_discovery import get_fabric_config, is_fabric_ready
+            _get_fabric_config, _is_fabric_ready = get_fabric_config, is_fabric_ready
 
-        if not is_fabric_ready():
+        if not _is_fabric_ready():
             raise HTTPException(
                 status_code=503,
                 detail="Fabric backend not configured. Set FABRIC_WORKSPACE_ID "
                        "(graph model is discovered automatically).",
             )
 
-        cfg = get_fabric_config()
+        cfg = _get_fabric_config()
         workspace_id = kwargs.get("workspace_id") or cfg.workspace_id
         graph_model_id = kwargs.get("graph_model_id") or cfg.graph_model_id
 
@@ -124,22 +234,25 @@ used by other backends so routers don't need changes.
         )
 
         gate = get_fabric_gate()
-        await gate.acquire()
+        probe = await gate.acquire()
 
         try:
             return await self._execute_query_inner(
                 query, url, gate, **kwargs
             )
         finally:
-            gate.release()
+            gate.release(was_probe=probe)
 
     async def _execute_query_inner(
         self, query: str, url: str, gate, **kwargs
     ) -> dict:
-        """Inner retry loop — runs with semaphore held."""
+        """Inner retry loop — runs with the capacity limiter held.
+
+        Runs in the same task that called gate.acquire(): CapacityLimiter
+        tracks its borrower per task, so release() from another task fails.
+        """
         client = self._get_client()
         token = await self._get_token()
-        token_acquired_at = time.monotonic()
 
         max_attempts = max(
             _MAX_429_RETRIES, _MAX_COLDSTART_RETRIES, _MAX_CONTINUATION_RETRIES
@@ -154,108 +267,111 @@ used by other backends so routers don't need changes.
             if continuation_token:
                 payload["continuationToken"] = continuation_token
 
-            response = await client.post(
+            async with client.post(
                 url,
                 json=payload,
                 headers={
                     "Authorization": f"Bearer {token}",
                     "Content-Type": "application/json",
                 },
-            )
+            ) as response:
+                # --- HTTP 429: capacity throttled ---
+                if response.status == 429:
+                    retries_429 += 1
+                    await gate.record_429()
+                    if retries_429 > _MAX_429_RETRIES:
+                        raise HTTPException(
+                            status_code=429,
+                            detail="Fabric capacity exhausted — too many 429s.",
+                        )
+                    # Full jitter over the Retry-After window (1s floor) so
+                    # callers throttled together don't retry in lockstep
+                    wait = random.uniform(
+                        _MIN_RETRY_WAIT,
+                        _parse_retry_after(response, _DEFAULT_429_WAIT),
+                    )
+                    # Hand the connection back before backing off
+                    response.release()
+                    logger.warning(
+                        "Fabric API 429 — retrying in %.0fs (429 retry %d/%d)",
+                        wait, retries_429, _MAX_429_RETRIES,
+                    )
+                    await asyncio.sleep(wait)
+                    continue
+
+                # --- HTTP 500: check for ColdStartTimeout ---
+                if response.status == 500:
+                    try:
+                        body = orjson.loads(await response.read())
+                    except orjson.JSONDecodeError:
+                        body = {}
+                    if isinstance(body, dict) and body.get("errorCode") == "ColdStartTimeout":
+                        retries_coldstart += 1
+                        if retries_coldstart > _MAX_COLDSTART_RETRIES:
+                            raise HTTPException(
+                                status_code=503,
+                                detail="Fabric GQL engine cold start — retries exhausted. "
+                                       "The graph model is warming up. Please try again in a minute.",
+                            )
+                        cap = min(10 * (2 ** (retries_coldstart - 1)), 60)
+                        wait = random.uniform(_MIN_RETRY_WAIT, cap)  # full jitter
+                        logger.warning(
+                            "Fabric GQL ColdStartTimeout — retrying in %.0fs "
+                            "(attempt %d/%d)",
+                            wait, retries_coldstart, _MAX_COLDSTART_RETRIES,
+                        )
+                        continuation_token = None
+                        await asyncio.sleep(wait)
+                        # Cached token — only re-acquired if near expiry
+                        token = await self._get_token()
+                        continue
 
-            # --- HTTP 429: capacity throttled ---
-            if response.status_code == 429:
-                retries_429 += 1
-                await gate.record_429()
-                if retries_429 > _MAX_429_RETRIES:
+                    # Non-ColdStartTimeout 5xx — fail immediately
+                    await gate.record_server_error()
                     raise HTTPException(
-                        status_code=429,
-                        detail="Fabric capacity exhausted — too many 429s.",
+                        status_code=response.status,
+                        detail=f"Fabric GQL query failed: {(await response.text())[:500]}",
                     )
-                wait = _parse_retry_after(response, _DEFAULT_429_WAIT)
-                wait *= random.uniform(0.75, 1.25)
-                logger.warning(
-                    "Fabric API 429 — retrying in %.0fs (429 retry %d/%d)",
-                    wait, retries_429, _MAX_429_RETRIES,
-                )
-                await asyncio.sleep(wait)
-                continue
 
-            # --- HTTP 500: check for ColdStartTimeout ---
-            if response.status_code == 500:
-                body = (
-                    response.json()
-                    if response.headers.get("content-type", "").startswith(
-                        "application/json"
+                # --- Any other non-200 — fail immediately ---
+                if response.status != 200:
+                    raise HTTPException(
+                        status_code=response.status,
+                        detail=f"Fabric GQL query failed: {(await response.text())[:500]}",
                     )
-                    else {}
-                )
-                if body.get("errorCode") == "ColdStartTimeout":
-                    retries_coldstart += 1
-                    if retries_coldstart > _MAX_COLDSTART_RETRIES:
+
+                # --- 200 OK: parse body ---
+                body = await _read_result_body(response)
+                try:
+                    status_code = body["status"]["code"]
+                except (KeyError, TypeError):
+                    status_code = ""
+                result = body.get("result", body)
+
+                # Status 02000 = cold-start continuation — data still loading
+                if status_code == "02000" and result.get("nextPage"):
+                    retries_continuation += 1
+                    if retries_continuation > _MAX_CONTINUATION_RETRIES:
                         raise HTTPException(
                             status_code=503,
-                            detail="Fabric GQL engine cold start — retries exhausted. "
-                                   "The graph model is warming up. Please try again in a minute.",
+                            detail="Fabric GQL continuation retries exhausted.",
                         )
-                    wait = min(10 * (2 ** (retries_coldstart - 1)), 60)
-                    wait *= random.uniform(0.75, 1.25)
-                    logger.warning(
-                        "Fabric GQL ColdStartTimeout — retrying in %.0fs "
-                        "(attempt %d/%d)",
-                        wait, retries_coldstart, _MAX_COLDSTART_RETRIES,
+                    continuation_token = result["nextPage"]
+                    wait = 10
+                    logger.info(
+                        "Fabric GQL cold start (status 02000) — retrying with "
+                        "continuation token in %ds (attempt %d/%d)",
+                        wait, retries_continuation, _MAX_CONTINUATION_RETRIES,
                     )
-                    continuation_token = None
                     await asyncio.sleep(wait)
-                    # Re-acquire token only if stale
-                    if time.monotonic() - token_acquired_at > _TOKEN_STALE_THRESHOLD:
-                        token = await self._get_token()
-                        token_acquired_at = time.monotonic()
                     continue
 
-                # Non-ColdStartTimeout 5xx — fail immediately
-                await gate.record_server_error()
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Fabric GQL query failed: {response.text[:500]}",
-                )
-
-            # --- Any other non-200 — fail immediately ---
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Fabric GQL query failed: {response.text[:500]}",
-                )
-
-            # --- 200 OK: parse body ---
-            body = response.json()
-            status_code = body.get("status", {}).get("code", "")
-            result = body.get("result", body)
-
-            # Status 02000 = cold-start continuation — data still loading
-            if status_code == "02000" and result.get("nextPage"):
-                retries_continuation += 1
-                if retries_continuation > _MAX_CONTINUATION_RETRIES:
-                    raise HTTPException(
-                        status_code=503,
-                        detail="Fabric GQL continuation retries exhausted.",
-                    )
-                continuation_token = result["nextPage"]
-                wait = 10
-                logger.info(
-                    "Fabric GQL cold start (status 02000) — retrying with "
-                    "continuation token in %ds (attempt %d/%d)",
-                    wait, retries_continuation, _MAX_CONTINUATION_RETRIES,
-                )
-                await asyncio.sleep(wait)
-                continue
-
-            # Success
-            await gate.record_success()
-            return {
-                "columns": result.get("columns", []),
-                "data": result.get("data", []),
-            }
+                # Success
+                await gate.record_success()
+                return {
+                    "columns": result.get("columns", []),
+                    "data": result.get("data", []),
+                }
 
         raise HTTPException(
             status_code=503,
@@ -294,6 +410,12 @@ used by other backends so routers don't need changes.
          "s_props": ["PathType"], "t_props": ["LinkType"]},
     ]
 
+    # Prebuilt per-relationship queries — they never change, so they are
+    # built once at class definition rather than on every call.
+    _TOPOLOGY_QUERIES: list[_TopologyQuery] = [
+        _TopologyQuery.from_schema(r) for r in _TOPOLOGY_SCHEMA
+    ]
+
     async def get_topology(
         self,
         query: str | None = None,
@@ -310,73 +432,69 @@ used by other backends so routers don't need changes.
             result = await self.execute_query(query)
             return self._parse_topology_result(result, vertex_labels)
 
-        schema = self._TOPOLOGY_SCHEMA
+        jobs = self._TOPOLOGY_QUERIES
         if vertex_labels:
-            labels_set = set(vertex_labels)
-            schema = [
-                r for r in schema
-                if r["source"] in labels_set or r["target"] in labels_set
+            labels_filter = frozenset(vertex_labels)
+            jobs = [
+                tq for tq in jobs
+                if tq.source in labels_filter or tq.target in labels_filter
             ]
 
-        nodes_by_id: dict[str, dict] = {}
+        # Run the relationship queries concurrently — the throttle gate
+        # bounds how many actually hit Fabric at once.
+        results = await asyncio.gather(
+            *(self.execute_query(tq.query) for tq in jobs), return_exceptions=True,
+        )
+
+        nodes_seen: set[str] = set()
+        node_list: list[dict] = []
         edges_seen: set[str] = set()
         edge_list: list[dict] = []
-
-        for r in schema:
-            src_type = r["source"]
-            tgt_type = r["target"]
-            rel_name = r["rel"]
-            s_id = r["s_id"]
-            t_id = r["t_id"]
-            s_props = r.get("s_props", [])
-            t_props = r.get("t_props", [])
-
-            # Build RETURN clause with explicit properties
-            ret_cols = [f"s.`{s_id}` AS `s_{s_id}`"]
-            for p in s_props:
-                ret_cols.append(f"s.`{p}` AS `s_{p}`")
-            ret_cols.append(f"t.`{t_id}` AS `t_{t_id}`")
-            for p in t_props:
-                ret_cols.append(f"t.`{p}` AS `t_{p}`")
-
-            q = (
-                f"MATCH (s:`{src_type}`)-[e:`{rel_name}`]->(t:`{tgt_type}`) "
-                f"RETURN {', '.join(ret_cols)} LIMIT 500"
-            )
-            try:
-                result = await self.execute_query(q)
-            except Exception as exc:
-                logger.warning("Topology query failed for %s: %s", rel_name, exc)
+        # Bound once — called per row below
+        mark_node, add_node = nodes_seen.add, node_list.append
+        mark_edge, add_edge = edges_seen.add, edge_list.append
+
+        for tq, result in zip(jobs, results):
+            src_type = tq.source
+            tgt_type = tq.target
+            rel_name = tq.rel
+            s_id, s_key, s_prop_keys = tq.s_id, tq.s_key, tq.s_prop_keys
+            t_id, t_key, t_prop_keys = tq.t_id, tq.t_key, tq.t_prop_keys
+
+            if isinstance(result, BaseException):
+                logger.warning("Topology query failed for %s: %s", rel_name, result)
                 continue
 
             for row in result.get("data", []):
                 # Build source node
-                s_id_val = row.get(f"s_{s_id}", "")
+                s_id_val = row.get(s_key, "")
                 s_node_id = f"{src_type}:{s_id_val}"
-                if s_node_id not in nodes_by_id:
+                if s_node_id not in nodes_seen:
+                    mark_node(s_node_id)
                     s_node_props = {s_id: s_id_val}
-                    for p in s_props:
-                        v = row.get(f"s_{p}")
+                    for p, k in s_prop_keys:
+                        v = row.get(k)
                         if v is not None:
                             s_node_props[p] = v
-                    nodes_by_id[s_node_id] = {"id": s_node_id, "label": src_type, "properties": s_node_props}
+                    add_node({"id": s_node_id, "label": src_type, "properties": s_node_props})
 
                 # Build target node
-                t_id_val = row.get(f"t_{t_id}", "")
+                t_id_val = row.get(t_key, "")
                 t_node_id = f"{tgt_type}:{t_id_val}"
-                if t_node_id not in nodes_by_id:
+                if t_node_id not in nodes_seen:
+                    mark_node(t_node_id)
                     t_node_props = {t_id: t_id_val}
-                    for p in t_props:
-                        v = row.get(f"t_{p}")
+                    for p, k in t_prop_keys:
+                        v = row.get(k)
                         if v is not None:
                             t_node_props[p] = v
-                    nodes_by_id[t_node_id] = {"id": t_node_id, "label": tgt_type, "properties": t_node_props}
+                    add_node({"id": t_node_id, "label": tgt_type, "properties": t_node_props})
 
                 # Build edge
                 edge_id = f"{rel_name}:{s_node_id}->{t_node_id}"
                 if edge_id not in edges_seen:
-                    edges_seen.add(edge_id)
-                    edge_list.append({
+                    mark_edge(edge_id)
+                    add_edge({
                         "id": edge_id,
                         "source": s_node_id,
                         "target": t_node_id,
@@ -385,13 +503,13 @@ used by other backends so routers don't need changes.
                     })
 
         return {
-            "nodes": list(nodes_by_id.values()),
+            "nodes": node_list,
             "edges": edge_list,
         }
 
     def _parse_topology_result(self, result: dict, vertex_labels: list[str] | None) -> dict:
         """Parse a custom query result into nodes/edges (best-effort)."""
-        import json as _json
+        labels_filter = frozenset(vertex_labels) if vertex_labels else None
         nodes_by_id: dict[str, dict] = {}
         edges_seen: set[str] = set()
         edge_list: list[dict] = []
@@ -403,7 +521,7 @@ used by other backends so routers don't need changes.
                 parsed = value
                 if isinstance(value, str):
                     try:
-                        parsed = _json.loads(value)
+                        parsed = orjson.loads(value)
                     except (ValueError, TypeError):
                         continue
                 if not isinstance(parsed, dict):
@@ -427,7 +545,7 @@ used by other backends so routers don't need changes.
                 else:
                     if oid and oid not in nodes_by_id:
                         label = labels[0] if labels else col_name
-                        if vertex_labels and label not in vertex_labels:
+                        if labels_filter is not None and label not in labels_filter:
                             continue
                         nodes_by_id[oid] = {"id": oid, "label": label, "properties": props}
 
@@ -462,17 +580,11 @@ used by other backends so routers don't need changes.
 
     def close(self) -> None:
         """Sync cleanup — V10's close_all_backends() calls this and
-        checks inspect.isawaitable(result) for async backends."""
-        if self._client and not self._client.is_closed:
-            try:
-                loop = asyncio.get_running_loop()
-                if not loop.is_closing():
-                    loop.create_task(self._client.aclose())
-                # If loop is closing, the client will be GC'd
-            except RuntimeError:
-                # No event loop — shouldn't happen in prod
-                pass
-            self._client = None
+        checks inspect.isawaitable(result) for async backends.
+
+        Nothing to release per instance: the HTTP session is shared and
+        closed by close_fabric_http_client() on app shutdown.
+        """
 
     async def ping(self) -> dict:
         """Health check — run a minimal GQL query against Fabric Ontology."""
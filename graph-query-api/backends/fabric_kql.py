@@ -64,7 +64,7 @@ class FabricKQLBackend:
         db = kwargs.get("database") or cfg.kql_db_name
 
         gate = get_fabric_gate()
-        await gate.acquire()
+        probe = await gate.acquire()
 
         try:
             response = await asyncio.to_thread(client.execute, db, query)
@@ -96,7 +96,7 @@ class FabricKQLBackend:
                 await gate.record_server_error()
             return {"error": True, "detail": str(e)}
         finally:
-            gate.release()
+            gate.release(was_probe=probe)
 
     async def ping(self) -> dict:
         """Health check — run a minimal KQL management command."""
@@ -1,10 +1,14 @@
 """
-Shared Fabric throttle gate — concurrency semaphore + circuit breaker.
+Shared Fabric throttle gate — concurrency limiter + circuit breaker.
 
 All Fabric API calls (GQL + KQL) must acquire/release through the singleton
 FabricThrottleGate to bound total concurrent load against the shared Fabric
 capacity (e.g. F8 = 8 CU).
 
+Fabric REST calls share one process-wide aiohttp session
+(get_fabric_http_client()) so TCP/TLS connections and DNS lookups are
+pooled across backend instances.
+
 Implements the Azure Architecture Circuit Breaker pattern:
   Closed → Open → Half-Open → Closed
 
@@ -19,6 +23,8 @@ import os
 import time
 from enum import Enum
 
+import anyio
+
 logger = logging.getLogger("graph-query-api.fabric-throttle")
 
 
@@ -29,7 +35,7 @@ class CircuitState(Enum):
 
 
 class FabricThrottleGate:
-    """Shared concurrency semaphore + circuit breaker for all Fabric API calls.
+    """Shared concurrency limiter + circuit breaker for all Fabric API calls.
 
     Singleton — use get_fabric_gate() to obtain the instance.
     Thread-safe via asyncio primitives.
@@ -37,7 +43,7 @@ class FabricThrottleGate:
 
     def __init__(self):
         max_concurrent = int(os.getenv("FABRIC_MAX_CONCURRENT", "3"))
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._limiter = anyio.CapacityLimiter(max_concurrent)
         self._threshold = int(os.getenv("FABRIC_CB_THRESHOLD", "3"))
         self._base_cooldown = float(os.getenv("FABRIC_CB_COOLDOWN", "60"))
         self._max_cooldown = 300.0
@@ -53,70 +59,86 @@ class FabricThrottleGate:
     def state(self) -> CircuitState:
         return self._state
 
-    async def acquire(self) -> None:
+    async def acquire(self) -> bool:
         """Acquire permission to make a Fabric API call.
 
         Raises HTTPException(503) if circuit is open.
-        Blocks if semaphore is full (queues behind other callers).
+        Blocks if the limiter is full (queues behind other callers).
+
+        Returns True if the caller is the half-open probe (no limiter slot
+        taken) — pass it back as release(was_probe=...).
         """
         from fastapi import HTTPException
 
-        async with self._lock:
-            if self._state == CircuitState.OPEN:
-                if time.monotonic() >= self._open_until:
-                    # Transition to half-open — allow one probe
-                    self._state = CircuitState.HALF_OPEN
-                    self._half_open_probe_allowed = True
-                    logger.info("Circuit breaker → HALF_OPEN (cooldown expired)")
-                else:
-                    remaining = int(self._open_until - time.monotonic())
-                    raise HTTPException(
-                        status_code=503,
-                        detail=f"Fabric capacity overloaded — circuit breaker open. "
-                               f"Retry in {remaining}s.",
-                        headers={"Retry-After": str(remaining)},
-                    )
-
-            # In half-open state, let the first caller bypass the semaphore
-            # to act as the probe request (avoids semaphore starvation).
-            if self._state == CircuitState.HALF_OPEN and self._half_open_probe_allowed:
-                self._half_open_probe_allowed = False
-                return  # probe bypasses semaphore
-
-        # Semaphore: block if at max concurrency (queuing, not rejecting)
-        await self._semaphore.acquire()
+        # Fast path: CLOSED (the common case) needs no lock — state only
+        # changes under the lock, and nothing below awaits before the
+        # limiter.  OPEN / HALF_OPEN transitions are decided under it.
+        if self._state is not CircuitState.CLOSED:
+            async with self._lock:
+                if self._state == CircuitState.OPEN:
+                    if time.monotonic() >= self._open_until:
+                        # Transition to half-open — allow one probe
+                        self._state = CircuitState.HALF_OPEN
+                        self._half_open_probe_allowed = True
+                        logger.info("Circuit breaker → HALF_OPEN (cooldown expired)")
+                    else:
+                        remaining = int(self._open_until - time.monotonic())
+                        raise HTTPException(
+                            status_code=503,
+                            detail=f"Fabric capacity overloaded — circuit breaker open. "
+                                   f"Retry in {remaining}s.",
+                            headers={"Retry-After": str(remaining)},
+                        )
+
+                # In half-open state, let the first caller bypass the limiter
+                # to act as the probe request (avoids limiter starvation).
+                if self._state == CircuitState.HALF_OPEN and self._half_open_probe_allowed:
+                    self._half_open_probe_allowed = False
+                    return True  # probe bypasses the limiter
+
+        # Limiter: block if at max concurrency (queuing, not rejecting)
+        await self._limiter.acquire()
 
         # Double-check: if circuit tripped to OPEN while we waited for
-        # the semaphore, release and reject.
-        async with self._lock:
-            if self._state == CircuitState.OPEN:
-                self._semaphore.release()
-                remaining = max(1, int(self._open_until - time.monotonic()))
-                raise HTTPException(
-                    status_code=503,
-                    detail=f"Fabric capacity overloaded — circuit breaker open. "
-                           f"Retry in {remaining}s.",
-                    headers={"Retry-After": str(remaining)},
-                )
+        # a limiter slot, release and reject.  A plain read suffices — there
+        # is no await between the check and the release.
+        if self._state == CircuitState.OPEN:
+            self._limiter.release()
+            remaining = max(1, int(self._open_until - time.monotonic()))
+            raise HTTPException(
+                status_code=503,
+                detail=f"Fabric capacity overloaded — circuit breaker open. "
+                       f"Retry in {remaining}s.",
+                headers={"Retry-After": str(remaining)},
+            )
+        return False
 
     def release(self, *, was_probe: bool = False) -> None:
-        """Release the semaphore slot after a Fabric API call completes.
+        """Release the limiter slot after a Fabric API call completes.
+
+        Must be called from the task that acquired (CapacityLimiter tracks
+        borrowers per task).
 
         Args:
-            was_probe: If True, the caller bypassed the semaphore (half-open
+            was_probe: If True, the caller bypassed the limiter (half-open
                        probe) and should NOT release it.
         """
         if not was_probe:
-            self._semaphore.release()
+            self._limiter.release()
 
     async def record_success(self) -> None:
-        """Record a successful Fabric API response (non-429, non-5xx)."""
-        async with self._lock:
-            self._consecutive_429s = 0
-            if self._state == CircuitState.HALF_OPEN:
-                self._state = CircuitState.CLOSED
-                self._current_cooldown = self._base_cooldown
-                logger.info("Circuit breaker → CLOSED (probe succeeded)")
+        """Record a successful Fabric API response (non-429, non-5xx).
+
+        Lock-free unless closing a half-open circuit: resetting the counter
+        is a single assignment with no await, so it can't interleave.
+        """
+        self._consecutive_429s = 0
+        if self._state is CircuitState.HALF_OPEN:
+            async with self._lock:
+                if self._state is CircuitState.HALF_OPEN:
+                    self._state = CircuitState.CLOSED
+                    self._current_cooldown = self._base_cooldown
+                    logger.info("Circuit breaker → CLOSED (probe succeeded)")
 
     async def record_429(self) -> None:
         """Record a 429 response. May trip the circuit."""
@@ -153,7 +175,7 @@ class FabricThrottleGate:
             "consecutive_429s": self._consecutive_429s,
             "cooldown_s": self._current_cooldown,
             "open_until": self._open_until,
-            "semaphore_available": self._semaphore._value,
+            "semaphore_available": int(self._limiter.available_tokens),
         }
 
 
@@ -173,3 +195,44 @@ def get_fabric_gate() -> FabricThrottleGate:
     if _gate is None:
         _gate = FabricThrottleGate()
     return _gate
+
+
+# ---------------------------------------------------------------------------
+# Shared HTTP session for Fabric REST calls
+# ---------------------------------------------------------------------------
+# One pooled session per process (same single-event-loop reasoning as the
+# gate).  Sized above FABRIC_MAX_CONCURRENT since the gate bounds in-flight
+# calls; closed by close_fabric_http_client() on app shutdown.
+
+_KEEPALIVE_TIMEOUT = 75  # seconds
+_REQUEST_TIMEOUT = 120  # seconds
+_DNS_CACHE_TTL = 300  # seconds
+
+_http_client = None  # aiohttp.ClientSession | None
+
+
+def get_fabric_http_client():
+    """Return the shared aiohttp.ClientSession for Fabric REST calls."""
+    global _http_client
+    if _http_client is None or _http_client.closed:
+        import aiohttp
+
+        pool_limit = int(os.getenv("FABRIC_MAX_CONCURRENT", "3")) * 2
+        _http_client = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=pool_limit,
+                limit_per_host=pool_limit,
+                keepalive_timeout=_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=_DNS_CACHE_TTL,
+            ),
+            timeout=aiohttp.ClientTimeout(total=_REQUEST_TIMEOUT),
+        )
+    return _http_client
+
+
+async def close_fabric_http_client() -> None:
+    """Close the shared Fabric HTTP session (called during app shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.closed:
+        await _http_client.close()
+    _http_client = None
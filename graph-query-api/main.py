@@ -86,6 +86,9 @@ async def _lifespan(app: FastAPI):
     yield
 
     await close_graph_backend()
+    # Close the shared Fabric HTTP session if it was created
+    from backends.fabric_throttle import close_fabric_http_client
+    await close_fabric_http_client()
     # Close the Cosmos DB client if it was initialized
     from cosmos_helpers import close_cosmos_client
     close_cosmos_client()
@@ -100,7 +103,11 @@ app = FastAPI(
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[o.strip() for o in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")],
+    allow_origins=frozenset(
+        o.strip()
+        for o in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
+        if o.strip()
+    ),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],